@@ -1,48 +1,64 @@
 import os
 import json
-import csv
+import base64
+import hashlib
 import io
+import time
 from datetime import datetime, timedelta
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, Query, Request, Response, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from pydantic import Field
 from typing import List
-from dotenv import load_dotenv
-from backend.classifier import classify
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-import requests
 
 try:
-    from backend.classifier import classify
+    from backend.recurrence import catch_up, next_occurrence
+    from backend.notifier import Notifier, telegram_from_env
+    from backend.executor import run_blocking
+    from backend.repository import get_repository
+    from backend.responses import FastJSONResponse, dumps
+    from backend.statement_parser import (
+        classify_chunks,
+        new_summary,
+        parse_bank_row,
+        parse_plain_row,
+        parse_rows,
+    )
 except ImportError:
-    from classifier import classify
+    from recurrence import catch_up, next_occurrence
+    from notifier import Notifier, telegram_from_env
+    from executor import run_blocking
+    from repository import get_repository
+    from responses import FastJSONResponse, dumps
+    from statement_parser import (
+        classify_chunks,
+        new_summary,
+        parse_bank_row,
+        parse_plain_row,
+        parse_rows,
+    )
 
-if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
-    try:
-        from backend.aws_db import (
-            init_db,
-            add_transaction,
-            get_transactions,
-            get_categories,
-        )
-    except ImportError:
-        from aws_db import init_db, add_transaction, get_transactions, get_categories
+# Only local runs read a .env file; Lambda is configured by SAM
+if not os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+    from dotenv import load_dotenv
 
-    def get_conn():
-        return None
+    load_dotenv()
 
-else:
-    try:
-        from backend.db import init_db, get_conn
-    except ImportError:
-        from db import init_db, get_conn
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# Seconds categories are served from memory and may be cached by clients;
+# bounds staleness for writes made by other processes or containers
+CATEGORIES_MAX_AGE = int(os.getenv("CATEGORIES_MAX_AGE", "300"))
 
-load_dotenv()
+# SQLite locally, DynamoDB on Lambda; chosen once per process
+repo = get_repository()
 
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# Telegram messages go out from a background thread, off the request path.
+# Lambda freezes the container as soon as a response is returned, so there
+# the handler flushes after every invocation and bursts are not held back
+ON_LAMBDA = bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+NOTIFY_FLUSH_TIMEOUT = float(os.getenv("NOTIFY_FLUSH_TIMEOUT", "5"))
+notifier = Notifier(telegram_from_env(), coalesce_window=0 if ON_LAMBDA else 1.0)
 
 app = FastAPI(title="Personal Finance Tracker (local)")
 
@@ -89,22 +105,45 @@ class ClassifiedTx(BaseModel):
     type: str = Field(default="expense")  # "income" | "expense"
     tags: str = ""
     frequency: str = "One-Off"
+    # Idempotency key; re-sending the same client_id is acknowledged, not saved
+    client_id: str | None = None
 
 
 class BulkCommitIn(BaseModel):
     transactions: List[ClassifiedTx]
 
 
-def send_telegram(text: str):
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        return
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    requests.post(url, data={"chat_id": TELEGRAM_CHAT_ID, "text": text})
+def iter_csv_rows(upload: UploadFile):
+    """
+    Yield CSV rows straight off the upload's spooled file, decoding UTF-8
+    incrementally instead of reading the whole body into memory.
+    """
+    import csv
+
+    upload.file.seek(0)
+    text = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Leave the underlying spool for UploadFile to close
+        text.detach()
+
+
+def cache_hit_ratio(stats: dict) -> float:
+    if not stats.get("total"):
+        return 0.0
+    return round(stats["cache_hits"] / stats["total"], 4)
 
 
 @app.on_event("startup")
 def startup():
-    init_db()
+    repo.init()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    notifier.flush(timeout=5)
+    repo.close()
 
 
 @app.get("/")
@@ -115,232 +154,272 @@ def serve_frontend():
 
 
 @app.post("/transactions")
-def add_transaction_endpoint(tx: TransactionIn):
-    if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
-        # Running on AWS - use DynamoDB
-        transaction_id = add_transaction(
-            tx.user_id,
-            tx.amount,
-            tx.category,
-            tx.description,
-            tx.type,
-            tx.tags,
-            tx.frequency,
-        )
-        text = f"Added transaction: {tx.user_id} {tx.amount} {tx.category} {tx.description}"
-    else:
-        # Running locally - use SQLite
-        date = tx.date or datetime.utcnow().isoformat()
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO transactions (user_id, date, amount, category, description) VALUES (?, ?, ?, ?, ?)",
-            (tx.user_id, date, tx.amount, tx.category, tx.description),
-        )
-        conn.commit()
-        conn.close()
-        text = f"Added transaction: {tx.user_id} {tx.amount} {tx.category} {tx.description}"
+async def add_transaction_endpoint(tx: TransactionIn):
+    row = tx.model_dump()
+    row["date"] = tx.date or datetime.utcnow().isoformat()
+    await run_blocking(repo.add_transaction, row)
+    text = f"Added transaction: {tx.user_id} {tx.amount} {tx.category} {tx.description}"
 
-    send_telegram(text)
+    notifier.notify(text)
     return {"status": "ok", "message": text}
 
 
-@app.get("/transactions")
-def list_transactions(user_id: str = "default", limit: int = 100):
-    if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
-        # Running on AWS - use DynamoDB
-        rows = get_transactions(user_id, limit)
-    else:
-        # Running locally - use SQLite
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM transactions WHERE user_id = ? ORDER BY date DESC LIMIT ?",
-            (user_id, limit),
+def encode_cursor(position: dict) -> str:
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(position, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
+
+
+@app.get("/transactions", response_class=FastJSONResponse)
+async def list_transactions(
+    user_id: str = "default",
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+):
+    """
+    Newest-first page of transactions. Pass the returned next_cursor back as
+    cursor to fetch the following page; it is null on the last page.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    try:
+        rows, next_position = await run_blocking(
+            repo.list_transactions, user_id, limit, position
         )
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
-    return {"items": rows}
-
-
-@app.get("/report")
-def report(user_id: str = "default", days: int = 7):
-    if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
-        # Running on AWS - use DynamoDB
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-        rows = get_transactions(user_id, limit=1000)  # Get more transactions for report
-
-        # Filter by date
-        filtered_rows = [r for r in rows if r.get("date", "") >= cutoff]
-
-        total_income = sum(r["amount"] for r in filtered_rows if r["amount"] > 0)
-        total_expense = sum(r["amount"] for r in filtered_rows if r["amount"] < 0)
-    else:
-        # Running locally - use SQLite
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM transactions WHERE user_id = ? AND date >= ?",
-            (user_id, cutoff),
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    next_cursor = encode_cursor(next_position) if next_position else None
+    return FastJSONResponse({"items": rows, "next_cursor": next_cursor})
+
+
+@app.get("/transactions/changes", response_class=FastJSONResponse)
+async def transaction_changes(
+    user_id: str = "default",
+    since: str | None = None,
+    limit: int = Query(500, ge=1, le=1000),
+):
+    """
+    Transactions added or changed since a previous sync, oldest change first.
+    Omit since on the first sync, keep paging with the returned since while
+    has_more is true, and store the final since for next time.
+    """
+    position = decode_cursor(since) if since else None
+    try:
+        items, next_position, has_more = await run_blocking(
+            repo.changes_since, user_id, limit, position
         )
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
-        total_income = sum(r["amount"] for r in rows if r["amount"] > 0)
-        total_expense = sum(r["amount"] for r in rows if r["amount"] < 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid since")
+    return FastJSONResponse(
+        {"items": items, "since": encode_cursor(next_position), "has_more": has_more}
+    )
 
-    return {
-        "user_id": user_id,
-        "days": days,
-        "income": total_income,
-        "expense": total_expense,
-        "items": filtered_rows if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else rows,
-    }
+
+@app.get("/report", response_class=FastJSONResponse)
+async def report(
+    user_id: str = "default",
+    days: int = 7,
+    include_items: bool = False,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Income/expense totals with per-category and per-day breakdowns.
+    The matching transactions are only returned (one page at a time) when
+    include_items is set.
+    """
+    cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    items = None
+
+    summary = await run_blocking(repo.report_summary, user_id, cutoff)
+    if include_items:
+        items = await run_blocking(repo.report_items, user_id, cutoff, limit, offset)
+
+    result = {"user_id": user_id, "days": days, **summary}
+    if include_items:
+        result["items"] = items
+        result["limit"] = limit
+        result["offset"] = offset
+    return FastJSONResponse(result)
+
+
+@app.post("/report/rebuild")
+async def rebuild_report_rollups(user_id: str | None = None):
+    """Recompute the daily totals rollup from raw transactions."""
+    try:
+        await run_blocking(repo.rebuild_rollups, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok", "user_id": user_id}
+
+
+# Rendered /categories response: {"body", "etag", "expires"}
+_categories_cache = {}
+
+
+def invalidate_categories_cache():
+    """Call after anything in this process writes categories."""
+    _categories_cache.clear()
+
+
+async def cached_categories() -> dict:
+    if _categories_cache.get("expires", 0) > time.monotonic():
+        return _categories_cache
+    rows = await run_blocking(repo.categories)
+    body = dumps({"categories": rows})
+    _categories_cache.update(
+        body=body,
+        etag='"' + hashlib.sha1(body).hexdigest()[:20] + '"',
+        expires=time.monotonic() + CATEGORIES_MAX_AGE,
+    )
+    return _categories_cache
 
 
 @app.get("/categories")
-def get_categories_endpoint():
-    if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
-        # Running on AWS - use DynamoDB
-        rows = get_categories()
-    else:
-        # Running locally - use SQLite
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM categories ORDER BY type, name")
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
-    return {"categories": rows}
+async def get_categories_endpoint(request: Request):
+    """
+    Categories rarely change, so the rendered list is kept in memory and
+    clients revalidate with If-None-Match, getting 304 when unchanged.
+    """
+    cached = await cached_categories()
+    headers = {
+        "ETag": cached["etag"],
+        "Cache-Control": f"public, max-age={CATEGORIES_MAX_AGE}",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if cached["etag"] in tags or "*" in tags:
+        return Response(status_code=304, headers=headers)
+    return Response(cached["body"], media_type="application/json", headers=headers)
 
 
 @app.post("/recurring-transactions")
-def add_recurring_transaction(rt: RecurringTransactionsIn):
-    from datetime import datetime, timedelta
-
+async def add_recurring_transaction(rt: RecurringTransactionsIn):
+    """
+    Store a recurring transaction and, if it started in the past, create every
+    occurrence already due in the same database transaction.
+    """
     start_date = datetime.fromisoformat(rt.start_date)
+    end_date = datetime.fromisoformat(rt.end_date) if rt.end_date else None
+
+    first_due = next_occurrence(start_date, rt.frequency)
+    occurrences, next_due, active = catch_up(
+        first_due,
+        rt.frequency,
+        datetime.utcnow().date(),
+        end_date,
+        anchor_day=start_date.day,
+    )
 
-    if rt.frequency == "daily":
-        next_due = start_date + timedelta(days=1)
-    elif rt.frequency == "weekly":
-        next_due = start_date + timedelta(weeks=1)
-    elif rt.frequency == "monthly":
-        next_due = start_date + timedelta(days=30)
-    elif rt.frequency == "yearly":
-        next_due = start_date + timedelta(days=365)
-    else:
-        next_due = start_date
-
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """INSERT INTO recurring_transactions
-        (user_id, amount, category, description, frequency, type, tags, start_date, end_date, next_due_date)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            rt.user_id,
-            rt.amount,
-            rt.category,
-            rt.description,
-            rt.frequency,
-            rt.type,
-            rt.tags,
-            rt.start_date,
-            rt.end_date,
-            next_due.isoformat(),
-        ),
+    await run_blocking(
+        repo.add_recurring, rt.model_dump(), occurrences, next_due, active
     )
-    conn.commit()
-    conn.close()
 
-    return {"status": "ok", "message": f"Added recurring {rt.frequency} transaction"}
+    return {
+        "status": "ok",
+        "message": f"Added recurring {rt.frequency} transaction",
+        "created": len(occurrences),
+        "next_due_date": next_due.isoformat() if active else None,
+    }
 
 
 @app.get("/recurring-transactions")
-def list_recurring_transactions(user_id: str = "default"):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM recurring_transactions WHERE user_id = ? and is_active = 1",
-        (user_id,),
-    )
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
+async def list_recurring_transactions(user_id: str = "default"):
+    rows = await run_blocking(repo.list_recurring, user_id)
     return {"recurring_transactions": rows}
 
 
+def import_csv_rows(
+    upload: UploadFile, user_id: str, date_format: str, batch_size: int
+):
+    """Parse and insert a transactions CSV; returns (imported_count, errors)."""
+    csv_reader = iter_csv_rows(upload)
+
+    imported_count = 0
+    errors = []
+    batch = []
+
+    for row_num, row in enumerate(csv_reader, start=2):
+        try:
+            date_str = row.get("date", "").strip()
+            amount = float(row.get("amount", 0))
+            description = row.get("description", "").strip()
+            category = row.get("category", "uncategorized").strip()
+            tags = row.get("tags", "").strip()
+
+            try:
+                parsed_date = datetime.strptime(date_str, date_format)
+            except ValueError:
+                for fmt in [
+                    "%Y-%m-%d",
+                    "%m/%d/%Y",
+                    "%d/%m/%Y",
+                    "%Y-%m-%d %H:%M:%S",
+                ]:
+                    try:
+                        parsed_date = datetime.strptime(date_str, fmt)
+                        break
+                    except ValueError:
+                        continue
+                else:
+                    raise ValueError(f"Unable to parse date: {date_str}")
+            tx_type = "income" if amount > 0 else "expense"
+        except Exception as e:
+            errors.append(f"Row {row_num}: {str(e)}")
+            continue
+
+        batch.append(
+            (
+                row_num,
+                {
+                    "user_id": user_id,
+                    "date": parsed_date.isoformat(),
+                    "amount": amount,
+                    "category": category,
+                    "description": description,
+                    "type": tx_type,
+                    "tags": tags,
+                    "frequency": "One-Off",
+                },
+            )
+        )
+        if len(batch) >= batch_size:
+            imported_count += repo.import_batch(batch, errors)
+            batch = []
+
+    if batch:
+        imported_count += repo.import_batch(batch, errors)
+
+    return imported_count, errors
+
+
 @app.post("/import/csv")
 async def import_csv_transactions(
     file: UploadFile = File(...),
     user_id: str = "default",
     date_format: str = "%Y-%m-%d",
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=50000),
 ):
     """
     Import transactions from CSV file.
     Expected CSV format: date,amount,description,category,tags
+    Rows are written with executemany, one transaction per batch_size rows.
     """
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="File must be a CSV")
     try:
-        content = await file.read()
-        csv_content = content.decode("utf-8")
-        csv_reader = csv.DictReader(io.StringIO(csv_content))
-
-        imported_count = 0
-        errors = []
-
-        for row_num, row in enumerate(csv_reader, start=2):
-            try:
+        imported_count, errors = await run_blocking(
+            import_csv_rows, file, user_id, date_format, batch_size
+        )
 
-                date_str = row.get("date", "").strip()
-                amount = float(row.get("amount", 0))
-                description = row.get("description", "").strip()
-                category = row.get("category", "uncategorized").strip()
-                tags = row.get("tags", "").strip()
-
-                try:
-                    parsed_date = datetime.strptime(date_str, date_format)
-                except ValueError:
-
-                    for fmt in [
-                        "%Y-%m-%d",
-                        "%m/%d/%Y",
-                        "%d/%m/%Y",
-                        "%Y-%m-%d %H:%M:%S",
-                    ]:
-                        try:
-                            parsed_date = datetime.strptime(date_str, fmt)
-                            break
-                        except ValueError:
-                            continue
-                    else:
-                        raise ValueError(f"Unable to parse date: {date_str}")
-                tx_type = "income" if amount > 0 else "expense"
-
-                conn = get_conn()
-                cur = conn.cursor()
-                cur.execute(
-                    """INSERT INTO transactions
-                        (user_id, date, amount, category, description, type, tags, frequency)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        user_id,
-                        parsed_date.isoformat(),
-                        amount,
-                        category,
-                        description,
-                        tx_type,
-                        tags,
-                        "One-Off",
-                    ),
-                )
-                conn.commit()
-                conn.close()
-
-                imported_count += 1
-
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
         return {
             "status": "ok",
             "imported_count": imported_count,
@@ -371,120 +450,41 @@ def get_csv_template():
     }
 
 
+def classify_upload(upload: UploadFile, user_id: str, parse):
+    """Parse an uploaded statement with `parse` and classify it in chunks."""
+    results = []
+    summary = new_summary()
+    stats = {}
+    rows = parse_rows(iter_csv_rows(upload), parse, summary)
+    for chunk in classify_chunks(
+        rows, summary, IMPORT_CHUNK_SIZE, stats, user_id=user_id
+    ):
+        results.extend(chunk)
+    summary["cache_hit_ratio"] = cache_hit_ratio(stats)
+    return summary, results
+
+
 @app.post("/import-csv-smart")
-def import_csv_smart(file: UploadFile = File(...), user_id: str = "default"):
+async def import_csv_smart(file: UploadFile = File(...), user_id: str = "default"):
     try:
-        content = file.file.read().decode("utf-8")
-        reader = csv.DictReader(io.StringIO(content))
-
-        results = []
-        summary = {
-            "total": 0,
-            "auto-classified": 0,
-            "needs_review": 0,
-            "categories": {},
-        }
-
-        for row in reader:
-            desc = row.get("description") or row.get("Description") or ""
-            amt = float(row.get("amount") or row.get("Amount") or 0)
-            date = row.get("date") or row.get("Date") or datetime.utcnow().isoformat()
-
-            cat, conf, reason = classify(desc, amt)
-            tx = {
-                "user_id": user_id,
-                "date": date,
-                "amount": amt,
-                "description": desc,
-                "category": cat,
-                "type": "income" if amt > 0 else "expense",
-                "frequency": "One-Off",
-                "classification": {
-                    "category": cat,
-                    "confidence": conf,
-                    "reason": reason,
-                    "needs_review": conf < 0.7,
-                },
-            }
-            results.append(tx)
-            summary["total"] += 1
-            summary["categories"][cat] = summary["categories"].get(cat, 0) + 1
-            if conf < 0.7:
-                summary["needs_review"] += 1
-            else:
-                summary["auto-classified"] += 1
+        summary, results = await run_blocking(
+            classify_upload, file, user_id, parse_plain_row
+        )
         return {"status": "success", "summary": summary, "transactions": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing CSV: {str(e)}")
 
 
 @app.post("/import-bank-csv")
-def import_bank_csv(file: UploadFile = File(...), user_id: str = "defauly"):
+async def import_bank_csv(file: UploadFile = File(...), user_id: str = "defauly"):
     """
     Import transactions from bank CSV format.
     Expected CSV format: Process Date,Amount,Other Party,Credit Plan Name,Transaction Date,Foreign Details,City,Country Code
     """
     try:
-        content = file.file.read().decode("utf-8")
-        reader = csv.DictReader(io.StringIO(content))
-
-        results = []
-        summary = {
-            "total": 0,
-            "auto-classified": 0,
-            "needs_review": 0,
-            "categories": {},
-        }
-
-        for row in reader:
-
-            other_party = row.get("Other Party", "").strip()
-            amount_str = row.get("Amount", "0").strip()
-            transaction_date = row.get("Transaction Date", "").strip()
-
-            try:
-                amount = float(amount_str)
-            except ValueError:
-                continue
-
-            try:
-                parsed_date = datetime.strptime(transaction_date, "%d/%m/%Y")
-                date_iso = parsed_date.isoformat()
-            except ValueError:
-
-                for fmt in ["%d/%m/%Y", "%Y-%m-%d", "%m/%d/%Y"]:
-                    try:
-                        parsed_date = datetime.strptime(transaction_date, fmt)
-                        date_iso = parsed_date.isoformat()
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    date_iso = datetime.utcnow().isoformat()
-            cat, conf, reason = classify(other_party, amount)
-
-            tx = {
-                "user_id": user_id,
-                "date": date_iso,
-                "amount": amount,
-                "description": other_party,
-                "category": cat,
-                "type": "income" if amount > 0 else "expense",
-                "frequency": "One-Off",
-                "classification": {
-                    "category": cat,
-                    "confidence": conf,
-                    "reason": reason,
-                    "needs_review": conf < 0.7,
-                },
-            }
-            results.append(tx)
-            summary["total"] += 1
-            summary["categories"][cat] = summary["categories"].get(cat, 0) + 1
-            if conf < 0.7:
-                summary["needs_review"] += 1
-            else:
-                summary["auto-classified"] += 1
+        summary, results = await run_blocking(
+            classify_upload, file, user_id, parse_bank_row
+        )
         return {"status": "success", "summary": summary, "transactions": results}
     except Exception as e:
         raise HTTPException(
@@ -493,58 +493,28 @@ def import_bank_csv(file: UploadFile = File(...), user_id: str = "defauly"):
 
 
 @app.post("/transaction/commit-bulk")
-def commit_bulk(body: BulkCommitIn):
-    saved, failed = 0, []
+async def commit_bulk(body: BulkCommitIn):
     try:
-        if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
-            from aws_db import add_transaction as aws_add
-
-            for tx in body.transactions:
-                try:
-                    aws_add(
-                        tx.user_id,
-                        tx.amount,
-                        tx.category,
-                        tx.description,
-                        tx.type,
-                        tx.tags,
-                        tx.frequency,
-                    )
-                    saved += 1
-                except Exception as e:
-                    failed.append({"tx": tx.model_dump(), "error": str(e)})
-        else:
-            conn = get_conn()
-            cur = conn.cursor()
-            for tx in body.transactions:
-                try:
-                    date = tx.date or datetime.utcnow().isoformat()
-                    cur.execute(
-                        "INSERT INTO transactions (user_id, date, amount, category, description, type, tags, frequency) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            tx.user_id,
-                            date,
-                            tx.amount,
-                            tx.category,
-                            tx.description,
-                            tx.type,
-                            tx.tags,
-                            tx.frequency,
-                        ),
-                    )
-                    saved += 1
-                except Exception as e:
-                    failed.append({"tx": tx.model_dump(), "error": str(e)})
-            conn.commit()
-            conn.close()
+        rows = []
+        for tx in body.transactions:
+            row = tx.model_dump()
+            row["date"] = tx.date or datetime.utcnow().isoformat()
+            rows.append(row)
+        saved, failed, acknowledged = await run_blocking(repo.add_transactions, rows)
         return {
             "status": "ok",
             "saved": saved,
             "failed": failed,
+            "duplicates": sum(1 for ack in acknowledged if ack["duplicate"]),
+            "acknowledged": acknowledged,
             "total": len(body.transactions),
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Bulk commit failed: {str(e)}")
 
 
-app.mount("/static", StaticFiles(directory="frontend"), name="static")
+# The frontend is only bundled with local runs
+if os.path.isdir("frontend"):
+    from fastapi.staticfiles import StaticFiles
+
+    app.mount("/static", StaticFiles(directory="frontend"), name="static")
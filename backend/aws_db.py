@@ -1,10 +1,18 @@
 import boto3
 import json
+import time
 import uuid
 import os
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from backend.recurrence import due_shard
+except ImportError:
+    from recurrence import due_shard
 
 dynamodb = boto3.resource("dynamodb")
 
@@ -12,14 +20,75 @@ dynamodb = boto3.resource("dynamodb")
 TRANSACTIONS_TABLE = os.environ.get("TRANSACTIONS_TABLE", "FinanceTracker-Transactions")
 CATEGORIES_TABLE = os.environ.get("CATEGORIES_TABLE", "FinanceTracker-Categories")
 RECURRING_TABLE = os.environ.get("RECURRING_TABLE", "FinanceTracker-Recurring")
+DAILY_TOTALS_TABLE = os.environ.get("DAILY_TOTALS_TABLE", "FinanceTracker-DailyTotals")
+# GSI on (user_id, updated_at) that delta sync reads changes from
+UPDATED_INDEX = os.environ.get("TRANSACTIONS_UPDATED_INDEX", "UpdatedIndex")
+# Writers stamp updated_at from their own clocks, so a write can land
+# slightly behind a timestamp a client has already synced past; each sync
+# re-reads this window and clients dedupe by transaction_id
+SYNC_OVERLAP_SECONDS = int(os.environ.get("SYNC_OVERLAP_SECONDS", "120"))
 
 transactions_table = dynamodb.Table(TRANSACTIONS_TABLE)
 categories_table = dynamodb.Table(CATEGORIES_TABLE)
 recurring_table = dynamodb.Table(RECURRING_TABLE)
+daily_totals_table = dynamodb.Table(DAILY_TOTALS_TABLE)
+
+
+@dataclass(slots=True)
+class TransactionRecord:
+    """A transaction as returned by the API, built directly from a DynamoDB item"""
+
+    user_id: str
+    transaction_id: str
+    date: str
+    amount: float
+    category: str
+    description: str
+    type: str
+    tags: str
+    frequency: str
+    created_at: str | None = None
+    source: str | None = None
+    recurring_id: str | None = None
+    updated_at: str | None = None
+    client_id: str | None = None
+
+
+def _record(item: Dict) -> TransactionRecord:
+    get = item.get
+    return TransactionRecord(
+        item["user_id"],
+        item["transaction_id"],
+        get("date", ""),
+        float(get("amount", 0)),
+        get("category"),
+        get("description", ""),
+        get("type", "expense"),
+        get("tags", ""),
+        get("frequency", "One-Off"),
+        get("created_at"),
+        get("source"),
+        get("recurring_id"),
+        get("updated_at"),
+        get("client_id"),
+    )
+
+
+# BatchWriteItem accepts at most 25 puts per call
+BATCH_WRITE_SIZE = 25
+BULK_RETRIES = int(os.environ.get("DYNAMODB_BULK_RETRIES", "5"))
+BULK_BACKOFF = 0.05
+# Batches written concurrently by add_transactions
+BULK_SEGMENTS = int(os.environ.get("DYNAMODB_BULK_SEGMENTS", "4"))
+# _put_new result for a client_id that was already stored
+DUPLICATE = "duplicate"
 
 
 def init_db():
-    """Initialize default categories in DynamoDB"""
+    """
+    Seed the default categories. Run once per deployment (see handler.py),
+    not on every cold start; the conditional puts make reruns harmless.
+    """
     default_categories = [
         {
             "category_id": "food-dining",
@@ -61,13 +130,14 @@ def add_transaction(
     tx_type: str = "expense",
     tags: str = "",
     frequency: str = "One-Off",
+    date: str | None = None,
 ):
-    """Add a transaction to DynamoDB"""
+    """Add a transaction to DynamoDB, dated now unless a date is given"""
     transaction_id = str(uuid.uuid4())
     item = {
         "user_id": user_id,
         "transaction_id": transaction_id,
-        "date": datetime.utcnow().isoformat(),
+        "date": date or datetime.utcnow().isoformat(),
         "amount": Decimal(str(amount)),
         "category": category,
         "description": description,
@@ -76,30 +146,463 @@ def add_transaction(
         "frequency": frequency,
         "created_at": datetime.utcnow().isoformat(),
     }
+    item["updated_at"] = item["created_at"]
 
     transactions_table.put_item(Item=item)
+    add_to_daily_totals(user_id, item["date"], category, item["amount"])
     return transaction_id
 
 
-def get_transactions(user_id: str, limit: int = 100) -> List[Dict]:
-    """Get transactions for a user"""
-    response = transactions_table.query(
-        KeyConditionExpression="user_id = :user_id",
-        ScanIndexForward=False,  # Sort by date descending
-        Limit=limit,
-        ExpressionAttributeValues={":user_id": user_id},
+def _daily_totals_key(user_id: str, day: str, category: str) -> Dict:
+    return {"user_id": user_id, "day_category": f"{day}#{category or ''}"}
+
+
+def add_to_daily_totals(user_id: str, date: str, category: str, amount: Decimal):
+    """Fold one transaction into its (user, day, category) rollup item"""
+    zero = Decimal("0")
+    _add_daily_delta(
+        user_id,
+        date[:10],
+        category,
+        amount if amount > 0 else zero,
+        amount if amount < 0 else zero,
+        1,
     )
 
-    # Convert Decimal types back to float for JSON serialization
-    items = response.get("Items", [])
-    for item in items:
-        if "amount" in item:
-            item["amount"] = float(item["amount"])
 
+def _add_daily_delta(
+    user_id: str, day: str, category: str, income: Decimal, expense: Decimal, count
+):
+    daily_totals_table.update_item(
+        Key=_daily_totals_key(user_id, day, category),
+        UpdateExpression=(
+            "SET #day = :day, category = :category "
+            "ADD income :income, expense :expense, #count :count"
+        ),
+        ExpressionAttributeNames={"#day": "day", "#count": "count"},
+        ExpressionAttributeValues={
+            ":day": day,
+            ":category": category or "",
+            ":income": income,
+            ":expense": expense,
+            ":count": count,
+        },
+    )
+
+
+def _write_batch(items: List[Dict]) -> List[Tuple[Dict, str]]:
+    """
+    One BatchWriteItem call, resubmitting UnprocessedItems with backoff.
+    Returns (item, error) for every item that could not be written.
+    """
+    client = transactions_table.meta.client
+    pending = [{"PutRequest": {"Item": item}} for item in items]
+    for attempt in range(BULK_RETRIES + 1):
+        try:
+            response = client.batch_write_item(
+                RequestItems={TRANSACTIONS_TABLE: pending}
+            )
+        except Exception as e:
+            return [(request["PutRequest"]["Item"], str(e)) for request in pending]
+        pending = response.get("UnprocessedItems", {}).get(TRANSACTIONS_TABLE, [])
+        if not pending:
+            return []
+        if attempt < BULK_RETRIES:
+            time.sleep(BULK_BACKOFF * 2**attempt)
+    return [
+        (request["PutRequest"]["Item"], "Unprocessed after retries")
+        for request in pending
+    ]
+
+
+def _put_new(item: Dict) -> Optional[str]:
+    """
+    Conditional put for an item with a client idempotency key. Returns None
+    when written, DUPLICATE if it already exists, or the error message.
+    """
+    try:
+        transactions_table.meta.client.put_item(
+            TableName=TRANSACTIONS_TABLE,
+            Item=item,
+            ConditionExpression="attribute_not_exists(transaction_id)",
+        )
+        return None
+    except Exception as e:
+        code = getattr(e, "response", {}).get("Error", {}).get("Code")
+        if code == "ConditionalCheckFailedException":
+            return DUPLICATE
+        return str(e)
+
+
+def add_transactions(
+    transactions: List[Dict], segments: int = BULK_SEGMENTS
+) -> Tuple[int, List[Dict], List[Dict]]:
+    """
+    Bulk insert. Plain rows go through BatchWriteItem, 25 items per call;
+    rows with a client_id get a transaction_id derived from it and a
+    conditional put, so a retried upload is acknowledged, not re-inserted.
+    Up to `segments` calls are in flight.
+
+    Plain rows may carry their own transaction_id. Returns (saved, failed,
+    acknowledged): failed holds {"tx", "transaction_id", "error"} for each
+    transaction not written, acknowledged holds {"client_id",
+    "transaction_id", "duplicate"} for each keyed transaction now stored.
+    """
+    now = datetime.utcnow().isoformat()
+    originals, plain, keyed = {}, [], []
+    for tx in transactions:
+        client_id = tx.get("client_id")
+        if client_id:
+            transaction_id = str(
+                uuid.uuid5(uuid.NAMESPACE_URL, f"{tx['user_id']}/{client_id}")
+            )
+        else:
+            transaction_id = tx.get("transaction_id") or str(uuid.uuid4())
+        originals[transaction_id] = tx
+        item = {
+            "user_id": tx["user_id"],
+            "transaction_id": transaction_id,
+            "date": tx.get("date") or now,
+            "amount": Decimal(str(tx["amount"])),
+            "category": tx.get("category"),
+            "description": tx.get("description", ""),
+            "type": tx.get("type", "expense"),
+            "tags": tx.get("tags", ""),
+            "frequency": tx.get("frequency", "One-Off"),
+            "created_at": now,
+            "updated_at": now,
+        }
+        if client_id:
+            item["client_id"] = client_id
+            keyed.append(item)
+        else:
+            plain.append(item)
+
+    batches = [
+        plain[i : i + BATCH_WRITE_SIZE] for i in range(0, len(plain), BATCH_WRITE_SIZE)
+    ]
+    # Low-level clients are thread safe, unlike the Table resources
+    with ThreadPoolExecutor(max_workers=max(segments, 1)) as pool:
+        batch_results = list(pool.map(_write_batch, batches))
+        keyed_results = list(pool.map(_put_new, keyed))
+
+    errors = {
+        item["transaction_id"]: error
+        for result in batch_results
+        for item, error in result
+    }
+    # Rows this call stored; a keyed row that was already there is not one,
+    # even when another row of the same request wrote its transaction_id
+    written = [item for item in plain if item["transaction_id"] not in errors]
+    written += [item for item, error in zip(keyed, keyed_results) if error is None]
+    acknowledged = []
+    for item, error in zip(keyed, keyed_results):
+        if error is None or error == DUPLICATE:
+            acknowledged.append(
+                {
+                    "client_id": item["client_id"],
+                    "transaction_id": item["transaction_id"],
+                    "duplicate": error == DUPLICATE,
+                }
+            )
+        if error is not None:
+            errors[item["transaction_id"]] = error
+    failed = [
+        {
+            "tx": originals[transaction_id],
+            "transaction_id": transaction_id,
+            "error": error,
+        }
+        for transaction_id, error in errors.items()
+        if error != DUPLICATE
+    ]
+
+    # One rollup update per (user, day, category) touched by the new rows
+    deltas = {}
+    for item in written:
+        _add_to_totals(deltas, (item["user_id"], *_rollup_key(item)), item["amount"])
+    for (user_id, day, category), (income, expense, count) in deltas.items():
+        _add_daily_delta(user_id, day, category, income, expense, count)
+
+    return len(written), failed, acknowledged
+
+
+def get_daily_totals(user_id: str, since_day: str) -> List[Tuple]:
+    """Get (day, category, income, expense, count) rollups from since_day on"""
+    query = {
+        "KeyConditionExpression": "user_id = :user_id AND day_category >= :since",
+        "ExpressionAttributeValues": {":user_id": user_id, ":since": since_day},
+    }
+    rows = []
+    while True:
+        response = daily_totals_table.query(**query)
+        for item in response.get("Items", []):
+            rows.append(
+                (
+                    item["day"],
+                    item.get("category", ""),
+                    float(item.get("income", 0)),
+                    float(item.get("expense", 0)),
+                    int(item.get("count", 0)),
+                )
+            )
+        if "LastEvaluatedKey" not in response:
+            return rows
+        query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _add_to_totals(totals: Dict, key: Tuple, amount: Decimal):
+    """Fold one amount into an [income, expense, count] rollup bucket"""
+    bucket = totals.setdefault(key, [Decimal("0"), Decimal("0"), 0])
+    if amount > 0:
+        bucket[0] += amount
+    elif amount < 0:
+        bucket[1] += amount
+    bucket[2] += 1
+
+
+def _rollup_key(item: Dict) -> Tuple[str, str]:
+    return item.get("date", "")[:10], item.get("category") or ""
+
+
+def _replace_daily_totals(user_id: str, totals: Dict):
+    """Swap a user's rollup items for the given (day, category) totals"""
+    existing = []
+    query = {
+        "KeyConditionExpression": "user_id = :user_id",
+        "ExpressionAttributeValues": {":user_id": user_id},
+        "ProjectionExpression": "user_id, day_category",
+    }
+    while True:
+        response = daily_totals_table.query(**query)
+        existing.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            break
+        query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    with daily_totals_table.batch_writer(
+        overwrite_by_pkeys=["user_id", "day_category"]
+    ) as batch:
+        for key in existing:
+            batch.delete_item(Key=key)
+        for (day, category), (income, expense, count) in totals.items():
+            batch.put_item(
+                Item={
+                    **_daily_totals_key(user_id, day, category),
+                    "day": day,
+                    "category": category,
+                    "income": income,
+                    "expense": expense,
+                    "count": count,
+                }
+            )
+
+
+def rebuild_daily_totals(user_id: str):
+    """Recompute a user's rollup items from their raw transactions"""
+    totals = {}
+    start_key = None
+    while True:
+        items, start_key = _query_transactions(user_id, 1000, start_key)
+        for item in items:
+            _add_to_totals(totals, _rollup_key(item), item.get("amount", Decimal("0")))
+        if not start_key:
+            break
+    _replace_daily_totals(user_id, totals)
+
+
+def backfill_daily_totals() -> int:
+    """
+    Rebuild every user's rollup items from one scan of the transactions
+    table, for history written before rollups existed. Safe to rerun;
+    returns the number of users rebuilt.
+    """
+    scan = {
+        "ProjectionExpression": "user_id, #date, category, amount",
+        "ExpressionAttributeNames": {"#date": "date"},
+    }
+    totals = {}
+    while True:
+        response = transactions_table.scan(**scan)
+        for item in response.get("Items", []):
+            _add_to_totals(
+                totals.setdefault(item["user_id"], {}),
+                _rollup_key(item),
+                item.get("amount", Decimal("0")),
+            )
+        if "LastEvaluatedKey" not in response:
+            break
+        scan["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    for user_id, user_totals in totals.items():
+        _replace_daily_totals(user_id, user_totals)
+    return len(totals)
+
+
+def _query_transactions(
+    user_id: str, limit: int, start_key: Optional[Dict] = None
+) -> Tuple[List[Dict], Optional[Dict]]:
+    query = {
+        "KeyConditionExpression": "user_id = :user_id",
+        "ScanIndexForward": False,  # Sort by date descending
+        "Limit": limit,
+        "ExpressionAttributeValues": {":user_id": user_id},
+    }
+    if start_key:
+        query["ExclusiveStartKey"] = start_key
+    response = transactions_table.query(**query)
+    return response.get("Items", []), response.get("LastEvaluatedKey")
+
+
+def get_transactions_page(
+    user_id: str, limit: int = 100, start_key: Optional[Dict] = None
+) -> Tuple[List[TransactionRecord], Optional[Dict]]:
+    """Get one page of transactions and the key to resume after it"""
+    items, last_key = _query_transactions(user_id, limit, start_key)
+    return [_record(item) for item in items], last_key
+
+
+def get_transactions(user_id: str, limit: int = 100) -> List[TransactionRecord]:
+    """Get transactions for a user"""
+    items, _ = get_transactions_page(user_id, limit)
     return items
 
 
+def get_transactions_since(user_id: str, cutoff: str) -> List[TransactionRecord]:
+    """
+    All of a user's transactions dated cutoff or later. The table is keyed
+    by transaction_id, so this pages through every item of the user and
+    filters on date; callers sort the result themselves.
+    """
+    query = {
+        "KeyConditionExpression": "user_id = :user_id",
+        "FilterExpression": "#date >= :cutoff",
+        "ExpressionAttributeNames": {"#date": "date"},
+        "ExpressionAttributeValues": {":user_id": user_id, ":cutoff": cutoff},
+    }
+    records = []
+    while True:
+        response = transactions_table.query(**query)
+        records.extend(_record(item) for item in response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return records
+        query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
 def get_categories() -> List[Dict]:
     """Get all categories"""
     response = categories_table.scan()
     return response.get("Items", [])
+
+
+def add_recurring_transaction(item: Dict, occurrences: List[datetime]) -> str:
+    """
+    Store a recurring transaction and the occurrences already due. Active
+    items carry the DueIndex keys the recurring processor queries on.
+    """
+    recurring_id = str(uuid.uuid4())
+    item = {
+        **item,
+        "recurring_id": recurring_id,
+        "amount": Decimal(str(item["amount"])),
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    if item.get("is_active"):
+        item["due_shard"] = due_shard(recurring_id)
+        item["next_due_day"] = item["next_due_date"][:10]
+    recurring_table.put_item(Item=item)
+
+    with transactions_table.batch_writer() as batch:
+        for occurrence in occurrences:
+            batch.put_item(
+                Item={
+                    "user_id": item["user_id"],
+                    "transaction_id": str(uuid.uuid4()),
+                    "date": occurrence.isoformat(),
+                    "amount": item["amount"],
+                    "category": item["category"],
+                    "description": item["description"],
+                    "type": item["type"],
+                    "tags": item.get("tags", ""),
+                    "frequency": "One-Off",
+                    "created_at": item["created_at"],
+                    "updated_at": item["created_at"],
+                    "source": "recurring",
+                    "recurring_id": recurring_id,
+                }
+            )
+    for occurrence in occurrences:
+        add_to_daily_totals(
+            item["user_id"], occurrence.isoformat(), item["category"], item["amount"]
+        )
+    return recurring_id
+
+
+def get_recurring_transactions(user_id: str) -> List[Dict]:
+    """Get a user's active recurring transactions"""
+    query = {
+        "KeyConditionExpression": "user_id = :user_id",
+        "FilterExpression": "is_active = :active",
+        "ExpressionAttributeValues": {":user_id": user_id, ":active": True},
+    }
+    items = []
+    while True:
+        response = recurring_table.query(**query)
+        for item in response.get("Items", []):
+            item["amount"] = float(item["amount"])
+            items.append(item)
+        if "LastEvaluatedKey" not in response:
+            return items
+        query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def get_changes_page(
+    user_id: str, after: str, limit: int, start_key: Optional[Dict] = None
+) -> Tuple[List[TransactionRecord], Optional[Dict]]:
+    """
+    Transactions updated after `after` (minus the overlap window), oldest
+    change first, and the key to resume after this page.
+    """
+    since = after or ""
+    if after:
+        since = (
+            datetime.fromisoformat(after) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        ).isoformat()
+    query = {
+        "IndexName": UPDATED_INDEX,
+        "KeyConditionExpression": "user_id = :user_id AND updated_at > :since",
+        "ExpressionAttributeValues": {":user_id": user_id, ":since": since},
+        "Limit": limit,
+    }
+    if start_key:
+        query["ExclusiveStartKey"] = start_key
+    response = transactions_table.query(**query)
+    items = [_record(item) for item in response.get("Items", [])]
+    return items, response.get("LastEvaluatedKey")
+
+
+def backfill_updated_at() -> int:
+    """Give items written before delta sync an updated_at so they are indexed"""
+    scan = {
+        "FilterExpression": "attribute_not_exists(updated_at)",
+        "ProjectionExpression": "user_id, transaction_id, created_at, #date",
+        "ExpressionAttributeNames": {"#date": "date"},
+    }
+    updated = 0
+    while True:
+        response = transactions_table.scan(**scan)
+        for item in response.get("Items", []):
+            transactions_table.update_item(
+                Key={
+                    "user_id": item["user_id"],
+                    "transaction_id": item["transaction_id"],
+                },
+                UpdateExpression="SET updated_at = :updated_at",
+                ExpressionAttributeValues={
+                    ":updated_at": item.get("created_at") or item.get("date", "")
+                },
+            )
+            updated += 1
+        if "LastEvaluatedKey" not in response:
+            return updated
+        scan["ExclusiveStartKey"] = response["LastEvaluatedKey"]
@@ -1,3 +1,7 @@
+import re
+import threading
+from collections import OrderedDict
+
 classification_rules = {
     "Groceries": [
         "pak n save",
@@ -122,6 +126,99 @@ classification_rules = {
 }
 
 
+# (pattern, keyword ranks) built from classification_rules; reset by set_rules
+_matcher = None
+
+CLASSIFY_CACHE_SIZE = 4096
+_classify_cache = OrderedDict()
+_classify_cache_lock = threading.Lock()
+
+
+def set_rules(rules: dict):
+    """Replace the classification rules, dropping the compiled matcher and cache."""
+    global classification_rules, _matcher
+
+    classification_rules = rules
+    _matcher = None
+    with _classify_cache_lock:
+        _classify_cache.clear()
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a keyword trie; "" marks the end of a keyword."""
+    branches = [
+        re.escape(ch) + _trie_pattern(child) for ch, child in node.items() if ch
+    ]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+def _compile_rules(rules):
+    """
+    Build one regex over a trie of every keyword, so the engine tests a
+    single branch per character instead of every keyword in turn. A match
+    is the longest keyword starting at that position; the other keywords
+    starting there are its prefixes, so each keyword is mapped to the
+    highest priority (category, keyword) among its keyword prefixes.
+    """
+    ranks = {}
+    for cat, kws in rules.items():
+        for kw in kws:
+            if kw and kw not in ranks:
+                ranks[kw] = (len(ranks), cat, kw)
+    if not ranks:
+        return None, {}
+
+    trie = {}
+    for kw in ranks:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    best = {
+        kw: min(ranks[kw[:n]] for n in range(1, len(kw) + 1) if kw[:n] in ranks)
+        for kw in ranks
+    }
+    return re.compile(_trie_pattern(trie)), best
+
+
+def _get_matcher():
+    global _matcher
+
+    if _matcher is None:
+        _matcher = _compile_rules(classification_rules)
+    return _matcher
+
+
+def _match_keyword(desc: str):
+    """Return (category, keyword) for the highest priority keyword in desc."""
+    pattern, best = _get_matcher()
+    if pattern is None:
+        return None
+
+    # Search again one past each match start so keywords overlapping an
+    # earlier match are still seen; usually only one or two searches
+    found = None
+    pos = 0
+    while True:
+        m = pattern.search(desc, pos)
+        if m is None:
+            break
+        rank = best[m.group()]
+        if found is None or rank < found:
+            found = rank
+            if rank[0] == 0:
+                break
+        pos = m.start() + 1
+
+    if found is None:
+        return None
+    return found[1], found[2]
+
+
 def classify(description: str, amount: float):
     """
     Classify a transaction based on its description and amount.
@@ -130,10 +227,64 @@ def classify(description: str, amount: float):
 
     desc = (description or "").lower()
 
-    for cat, kws in classification_rules.items():
-        for kw in kws:
-            if kw in desc:
-                return (cat, 0.9, f"Matched: {kw}")
+    match = _match_keyword(desc)
+    if match:
+        cat, kw = match
+        return (cat, 0.9, f"Matched: {kw}")
     if amount > 0:
         return ("Incom", 0.7, "Positive amount")
     return ("Uncategorized", 0.0, "No match")
+
+
+def normalize_merchant(description: str) -> str:
+    """Lowercase and collapse whitespace so repeated merchants share a key."""
+    return " ".join((description or "").lower().split())
+
+
+def _cache_get(key):
+    with _classify_cache_lock:
+        result = _classify_cache.get(key)
+        if result is not None:
+            _classify_cache.move_to_end(key)
+        return result
+
+
+def _cache_put(key, result):
+    with _classify_cache_lock:
+        _classify_cache[key] = result
+        _classify_cache.move_to_end(key)
+        while len(_classify_cache) > CLASSIFY_CACHE_SIZE:
+            _classify_cache.popitem(last=False)
+
+
+def classify_many(descriptions, amounts, stats: dict | None = None):
+    """
+    Classify a batch of transactions, running the matcher once per unique
+    (merchant, amount sign) pair and reusing results from an LRU cache.
+    Returns a list of (Category, confidence, reason) in input order.
+    If stats is given it is filled with total/unique/cache_hits counts.
+    """
+    keys = [
+        (normalize_merchant(desc), amount > 0)
+        for desc, amount in zip(descriptions, amounts)
+    ]
+
+    resolved = {}
+    misses = 0
+    for key in keys:
+        if key in resolved:
+            continue
+        result = _cache_get(key)
+        if result is None:
+            merchant, positive = key
+            result = classify(merchant, 1.0 if positive else 0.0)
+            _cache_put(key, result)
+            misses += 1
+        resolved[key] = result
+
+    if stats is not None:
+        stats["total"] = stats.get("total", 0) + len(keys)
+        stats["unique"] = stats.get("unique", 0) + len(resolved)
+        stats["cache_hits"] = stats.get("cache_hits", 0) + len(keys) - misses
+
+    return [resolved[key] for key in keys]
@@ -1,11 +1,174 @@
+import os
+import queue
 import sqlite3
 from pathlib import Path
 
 DB_PATH = Path(__file__).parent / "finance.db"
 
+# Idle connections kept warm between requests
+POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(64 * 1024 * 1024)))
+
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+
+DEFAULT_CATEGORIES = [
+    ("Food & Dining", "expense", "#EF4444", "🍽️"),
+    ("Transportation", "expense", "#F59E0B", "🚗"),
+    ("Shopping", "expense", "#8B5CF6", "🛍️"),
+    ("Entertainment", "expense", "#EC4899", "🎬"),
+    ("Bills & Utilities", "expense", "#10B981", "💡"),
+    ("Healthcare", "expense", "#F97316", "🏥"),
+    ("Travel", "expense", "#06B6D4", "✈️"),
+    ("Salary", "income", "#22C55E", "💼"),
+    ("Freelance", "income", "#84CC16", "💻"),
+    ("Investment", "income", "#6366F1", "📈"),
+]
+
+# Per (user, day, category) totals kept in step with transactions by the
+# triggers below, so reports read a few rollup rows instead of raw history
+ROLLUP_DAY_SQL = "substr({0}.date, 1, 10)"
+ROLLUP_CATEGORY_SQL = "COALESCE({0}.category, '')"
+
+DAILY_TOTALS_BACKFILL_SQL = f"""
+    INSERT INTO daily_totals (user_id, day, category, income, expense, count)
+    SELECT user_id, {ROLLUP_DAY_SQL.format("t")}, {ROLLUP_CATEGORY_SQL.format("t")},
+        SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+        SUM(CASE WHEN amount < 0 THEN amount ELSE 0 END),
+        COUNT(*)
+    FROM transactions AS t
+    {{where}}
+    GROUP BY 1, 2, 3
+"""
+
+
+def _rollup_apply_sql(row: str, sign: str) -> str:
+    """Upsert one transaction row (NEW or OLD) into daily_totals."""
+    return f"""
+        INSERT INTO daily_totals (user_id, day, category, income, expense, count)
+        VALUES (
+            {row}.user_id,
+            {ROLLUP_DAY_SQL.format(row)},
+            {ROLLUP_CATEGORY_SQL.format(row)},
+            {sign}(CASE WHEN {row}.amount > 0 THEN {row}.amount ELSE 0 END),
+            {sign}(CASE WHEN {row}.amount < 0 THEN {row}.amount ELSE 0 END),
+            {sign}1
+        )
+        ON CONFLICT (user_id, day, category) DO UPDATE SET
+            income = income + excluded.income,
+            expense = expense + excluded.expense,
+            count = count + excluded.count;
+    """
+
+
+# Bump the sync counter and stamp the written row with it
+NEXT_SEQ_SQL = """
+    UPDATE sync_sequence SET value = value + 1 WHERE id = 1;
+    UPDATE transactions SET seq = (SELECT value FROM sync_sequence WHERE id = 1)
+    WHERE id = NEW.id;
+"""
+
+
+# Schema upgrades applied in order on startup, tracked with PRAGMA user_version
+MIGRATIONS = [
+    # 1: listing and keyset pagination seek on user_id and walk (date, id) in
+    # order; report windows use the (user_id, date) prefix
+    [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_date_id "
+        "ON transactions (user_id, date, id)",
+    ],
+    # 2: daily_totals rollup, maintained by triggers on every write path
+    [
+        """
+        CREATE TABLE IF NOT EXISTS daily_totals (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            category TEXT NOT NULL DEFAULT '',
+            income REAL NOT NULL DEFAULT 0,
+            expense REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day, category)
+        ) WITHOUT ROWID
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_totals_insert
+        AFTER INSERT ON transactions
+        BEGIN {_rollup_apply_sql("NEW", "")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_totals_delete
+        AFTER DELETE ON transactions
+        BEGIN {_rollup_apply_sql("OLD", "-")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_totals_update
+        AFTER UPDATE OF user_id, date, amount, category ON transactions
+        BEGIN {_rollup_apply_sql("OLD", "-")} {_rollup_apply_sql("NEW", "")} END
+        """,
+        "DELETE FROM daily_totals",
+        DAILY_TOTALS_BACKFILL_SQL.format(where=""),
+    ],
+    # 3: default categories, seeded once instead of on every startup
+    [
+        "INSERT OR IGNORE INTO categories (name, type, color, icon) VALUES "
+        + ", ".join(
+            "('{}', '{}', '{}', '{}')".format(*category)
+            for category in DEFAULT_CATEGORIES
+        ),
+    ],
+    # 4: change sequence for delta sync; every insert or edit stamps the row
+    # with the next value of a single counter, so clients can ask for
+    # everything after the last seq they saw
+    [
+        "ALTER TABLE transactions ADD COLUMN seq INTEGER",
+        """
+        CREATE TABLE IF NOT EXISTS sync_sequence (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            value INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO sync_sequence (id, value) "
+        "SELECT 1, COALESCE(MAX(id), 0) FROM transactions",
+        "UPDATE transactions SET seq = id",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_seq "
+        "ON transactions (user_id, seq)",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_seq_insert
+        AFTER INSERT ON transactions
+        BEGIN {NEXT_SEQ_SQL} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_seq_update
+        AFTER UPDATE OF user_id, date, amount, category, description, type, tags,
+            frequency ON transactions
+        BEGIN {NEXT_SEQ_SQL} END
+        """,
+    ],
+    # 5: client idempotency key, so a re-sent upload chunk is acknowledged
+    # instead of inserted twice
+    [
+        "ALTER TABLE transactions ADD COLUMN client_id TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_client_id "
+        "ON transactions (user_id, client_id) WHERE client_id IS NOT NULL",
+    ],
+]
+
+
+def _connect():
+    conn = sqlite3.connect(
+        DB_PATH, timeout=30.0, check_same_thread=False, cached_statements=256
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_conn()
     cur = conn.cursor()
 
     cur.execute(
@@ -57,29 +220,68 @@ def init_db():
         )
         """
     )
-    default_categories = [
-        ("Food & Dining", "expense", "#EF4444", "🍽️"),
-        ("Transportation", "expense", "#F59E0B", "🚗"),
-        ("Shopping", "expense", "#8B5CF6", "🛍️"),
-        ("Entertainment", "expense", "#EC4899", "🎬"),
-        ("Bills & Utilities", "expense", "#10B981", "💡"),
-        ("Healthcare", "expense", "#F97316", "🏥"),
-        ("Travel", "expense", "#06B6D4", "✈️"),
-        ("Salary", "income", "#22C55E", "💼"),
-        ("Freelance", "income", "#84CC16", "💻"),
-        ("Investment", "income", "#6366F1", "📈"),
-    ]
-
-    cur.executemany(
-        "INSERT OR IGNORE INTO categories (name, type, color, icon) VALUES (?, ?, ?, ?)",
-        default_categories,
-    )
-
     conn.commit()
-    conn.close()
+    migrate(conn)
+    release_conn(conn)
+
+
+def migrate(conn):
+    """Bring an existing database up to the latest schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= len(MIGRATIONS):
+        return
+
+    while version < len(MIGRATIONS):
+        # sqlite3 only opens transactions implicitly for DML, so DDL such as
+        # ALTER TABLE would commit on its own; begin explicitly so each
+        # migration and its version bump land together or not at all
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            # Another process may have migrated while we waited for the lock
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < len(MIGRATIONS):
+                for sql in MIGRATIONS[version]:
+                    conn.execute(sql)
+                version += 1
+                conn.execute(f"PRAGMA user_version = {version}")
+    conn.execute("ANALYZE")
+
+
+def rebuild_daily_totals(conn, user_id: str | None = None):
+    """Recompute the daily_totals rollup from raw transactions."""
+    with conn:
+        if user_id is None:
+            conn.execute("DELETE FROM daily_totals")
+            conn.execute(DAILY_TOTALS_BACKFILL_SQL.format(where=""))
+        else:
+            conn.execute("DELETE FROM daily_totals WHERE user_id = ?", (user_id,))
+            conn.execute(
+                DAILY_TOTALS_BACKFILL_SQL.format(where="WHERE user_id = ?"),
+                (user_id,),
+            )
 
 
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Check out a pooled connection; hand it back with release_conn()."""
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        return _connect()
+
+
+def release_conn(conn):
+    """Return a connection to the pool, discarding any unfinished transaction."""
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def close_pool():
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            return
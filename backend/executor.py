@@ -0,0 +1,16 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads available for blocking sqlite/boto3 work. SQLite serialises
+# writers anyway, so this mainly bounds concurrent readers and AWS calls.
+IO_THREADS = int(os.getenv("IO_THREADS", "16"))
+
+_executor = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="io")
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call on the I/O executor without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
@@ -5,7 +5,19 @@ import sys
 sys.path.append(os.path.dirname(__file__))
 
 from mangum import Mangum
-from app import app
+from app import NOTIFY_FLUSH_TIMEOUT, app, invalidate_categories_cache, notifier, repo
 
 # Create the Lambda handler
-handler = Mangum(app)
+asgi_handler = Mangum(app)
+
+
+def handler(event, context):
+    # One-off setup after a deploy: invoke the function with {"migrate": true}
+    if event.get("migrate"):
+        repo.migrate()
+        invalidate_categories_cache()
+        return {"statusCode": 200, "body": "migrated"}
+    response = asgi_handler(event, context)
+    # Send queued notifications before the container is frozen
+    notifier.flush(timeout=NOTIFY_FLUSH_TIMEOUT)
+    return response
@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+import time
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+
+class TelegramTransport:
+    """Posts a message to the Telegram Bot API; raises if it is not accepted."""
+
+    def __init__(self, token: str, chat_id: str, timeout: float = 5.0, parse_mode=None):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.parse_mode = parse_mode
+
+    def send(self, text: str):
+        import requests
+
+        data = {"chat_id": self.chat_id, "text": text}
+        if self.parse_mode:
+            data["parse_mode"] = self.parse_mode
+        response = requests.post(self.url, data=data, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class Notifier:
+    """
+    Sends notifications from a background thread so callers never wait on
+    the network. Messages arriving within coalesce_window of each other are
+    joined into one digest, and failed sends are retried with backoff.
+    Any object with a send(text) method can be used as the transport.
+    """
+
+    def __init__(
+        self,
+        transport,
+        coalesce_window: float = 1.0,
+        max_batch: int = 20,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_queue: int = 1000,
+    ):
+        self.transport = transport
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self.retries = retries
+        self.backoff = backoff
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def notify(self, text: str):
+        """Queue a message; drops it (and logs) if the queue is full."""
+        if self.transport is None:
+            return
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            print(f"Notification queue full, dropping: {text[:80]}")
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything queued so far has been sent or given up on."""
+        if self._worker is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="notifier", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.coalesce_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._send(digest(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send(self, text: str):
+        for attempt in range(self.retries + 1):
+            try:
+                self.transport.send(text)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    print(f"Failed to send notification: {e}")
+                    return
+                time.sleep(self.backoff * 2**attempt)
+
+
+def digest(messages) -> str:
+    """Join a burst of messages into one, within Telegram's size limit."""
+    if len(messages) == 1:
+        text = messages[0]
+    else:
+        text = f"{len(messages)} notifications\n\n" + "\n\n".join(messages)
+    if len(text) > MAX_MESSAGE_LENGTH:
+        text = text[: MAX_MESSAGE_LENGTH - 1] + "…"
+    return text
+
+
+def telegram_from_env(parse_mode=None):
+    """A TelegramTransport from TELEGRAM_BOT_TOKEN/TELEGRAM_CHAT_ID, or None."""
+    token = os.environ.get("TELEGRAM_BOT_TOKEN")
+    chat_id = os.environ.get("TELEGRAM_CHAT_ID")
+    if not token or not chat_id:
+        return None
+    return TelegramTransport(token, chat_id, parse_mode=parse_mode)
@@ -0,0 +1,79 @@
+import calendar
+import os
+import zlib
+from datetime import date, datetime, timedelta
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+
+# Upper bound on occurrences generated in one pass; anything beyond is
+# picked up by the next run since the pointer only advances past what
+# was emitted
+MAX_CATCH_UP = 1000
+
+# DynamoDB DueIndex partitions; due_shard is only set while an item is active
+DUE_SHARDS = int(os.environ.get("RECURRING_DUE_SHARDS", "4"))
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _add_months(value: datetime, months: int, anchor_day: int) -> datetime:
+    """Calendar month arithmetic, clamping to the last day of short months."""
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(anchor_day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def next_occurrence(
+    current: datetime, frequency: str, anchor_day: int | None = None
+) -> datetime:
+    """
+    The occurrence after current. anchor_day is the day of month the schedule
+    started on, so a 31st-of-month item returns to the 31st after February.
+    """
+    anchor_day = anchor_day or current.day
+
+    if frequency == "daily":
+        return current + timedelta(days=1)
+    if frequency == "weekly":
+        return current + timedelta(weeks=1)
+    if frequency == "yearly":
+        return _add_months(current, 12, anchor_day)
+    # monthly, and the default for anything unrecognised
+    return _add_months(current, 1, anchor_day)
+
+
+def catch_up(
+    next_due: datetime,
+    frequency: str,
+    until,
+    end_date=None,
+    anchor_day: int | None = None,
+    limit: int = MAX_CATCH_UP,
+):
+    """
+    Every occurrence from next_due up to and including the day `until`,
+    stopping after end_date. Returns (occurrences, new_next_due, active)
+    where active is False once the schedule has passed its end date.
+    """
+    until = _as_date(until)
+    end = _as_date(end_date) if end_date is not None else None
+
+    occurrences = []
+    current = next_due
+    while current.date() <= until and len(occurrences) < limit:
+        if end is not None and current.date() > end:
+            return occurrences, current, False
+        occurrences.append(current)
+        current = next_occurrence(current, frequency, anchor_day)
+
+    active = end is None or current.date() <= end
+    return occurrences, current, active
+
+
+def due_shard(recurring_id: str) -> str:
+    """DueIndex partition key for an active recurring item."""
+    return f"active#{zlib.crc32(recurring_id.encode('utf-8')) % DUE_SHARDS}"
@@ -0,0 +1,499 @@
+import os
+import sqlite3
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Column order shared by every transaction insert
+TRANSACTION_FIELDS = (
+    "user_id",
+    "date",
+    "amount",
+    "category",
+    "description",
+    "type",
+    "tags",
+    "frequency",
+)
+
+INSERT_TRANSACTION_SQL = """INSERT INTO transactions
+    (user_id, date, amount, category, description, type, tags, frequency)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Same insert for rows carrying a client_id; a repeat is silently skipped
+INSERT_KEYED_TRANSACTION_SQL = """INSERT INTO transactions
+    (user_id, date, amount, category, description, type, tags, frequency,
+        client_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (user_id, client_id) WHERE client_id IS NOT NULL DO NOTHING"""
+
+REPORT_WINDOW_SQL = """
+    SELECT day, category, income, expense, count
+    FROM daily_totals WHERE user_id = ? AND day > ?
+    UNION ALL
+    SELECT substr(date, 1, 10), COALESCE(category, ''),
+        SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+        SUM(CASE WHEN amount < 0 THEN amount ELSE 0 END),
+        COUNT(*)
+    FROM transactions WHERE user_id = ? AND date >= ? AND date < ?
+    GROUP BY 1, 2
+"""
+
+# Attributes of the LastEvaluatedKey DynamoDB returns for the transactions
+# table and for its UpdatedIndex, which also carries the table key
+TABLE_KEY = ("user_id", "transaction_id")
+UPDATED_INDEX_KEY = ("user_id", "transaction_id", "updated_at")
+
+
+def fold_daily_totals(rows) -> dict:
+    """
+    Fold (day, category, income, expense, count) rollup rows into report
+    totals with per-category and per-day breakdowns.
+    """
+    by_category, by_day = {}, {}
+    totals = {"income": 0, "expense": 0, "count": 0}
+    for day, category, income, expense, count in rows:
+        for bucket in (
+            totals,
+            by_category.setdefault(
+                category,
+                {"category": category, "income": 0, "expense": 0, "count": 0},
+            ),
+            by_day.setdefault(day, {"day": day, "income": 0, "expense": 0, "count": 0}),
+        ):
+            bucket["income"] += income
+            bucket["expense"] += expense
+            bucket["count"] += count
+
+    return {
+        **totals,
+        "by_category": sorted(by_category.values(), key=lambda b: b["expense"]),
+        "by_day": sorted(by_day.values(), key=lambda b: b["day"]),
+    }
+
+
+class Repository(ABC):
+    """
+    Storage operations behind the API. Transactions are passed as dicts keyed
+    by TRANSACTION_FIELDS; each engine is free to use its own fast paths.
+    All methods block, so async callers should go through run_blocking.
+    Engines must implement every abstract method to be instantiated.
+    """
+
+    @abstractmethod
+    def init(self):
+        ...
+
+    def close(self):
+        pass
+
+    def migrate(self):
+        """One-time data setup, such as seeding the default categories."""
+        self.init()
+
+    @abstractmethod
+    def add_transaction(self, tx: dict):
+        ...
+
+    @abstractmethod
+    def add_transactions(self, transactions: list) -> tuple:
+        """
+        Save many transactions; returns (saved, [{"tx", "error"}],
+        acknowledged). Rows with a client_id are stored at most once and
+        listed in acknowledged as {"client_id", "transaction_id",
+        "duplicate"}, whether or not this call wrote them.
+        """
+
+    @abstractmethod
+    def import_batch(self, batch, errors: list) -> int:
+        """Save (row_num, tx) pairs, reporting failures by row number."""
+
+    @abstractmethod
+    def list_transactions(self, user_id: str, limit: int, position=None) -> tuple:
+        """
+        One newest-first page and the position to resume after it (None on
+        the last page). Raises ValueError for a position it did not issue.
+        """
+
+    @abstractmethod
+    def changes_since(self, user_id: str, limit: int, position=None) -> tuple:
+        """
+        Transactions added or changed after `position`, oldest change first,
+        each carrying a stable transaction_id. Returns (items, position to
+        store for the next sync, has_more). Raises ValueError for a position
+        it did not issue.
+        """
+
+    @abstractmethod
+    def report_summary(self, user_id: str, cutoff: str) -> dict:
+        ...
+
+    @abstractmethod
+    def report_items(self, user_id: str, cutoff: str, limit: int, offset: int):
+        ...
+
+    @abstractmethod
+    def rebuild_rollups(self, user_id: str | None = None):
+        ...
+
+    @abstractmethod
+    def categories(self) -> list:
+        ...
+
+    @abstractmethod
+    def add_recurring(self, recurring: dict, occurrences, next_due, active: bool):
+        """Store a recurring transaction plus the occurrences already due."""
+
+    @abstractmethod
+    def list_recurring(self, user_id: str) -> list:
+        ...
+
+
+class SQLiteRepository(Repository):
+    def __init__(self):
+        try:
+            from backend import db
+        except ImportError:
+            import db
+        self.db = db
+
+    @contextmanager
+    def connection(self):
+        conn = self.db.get_conn()
+        try:
+            yield conn
+        finally:
+            self.db.release_conn(conn)
+
+    def init(self):
+        self.db.init_db()
+
+    def close(self):
+        self.db.close_pool()
+
+    def add_transaction(self, tx: dict):
+        with self.connection() as conn, conn:
+            cur = conn.execute(
+                INSERT_TRANSACTION_SQL, [tx.get(f) for f in TRANSACTION_FIELDS]
+            )
+        return cur.lastrowid
+
+    def add_transactions(self, transactions: list) -> tuple:
+        saved, failed, acknowledged = 0, [], []
+        with self.connection() as conn, conn:
+            for tx in transactions:
+                params = [tx.get(f) for f in TRANSACTION_FIELDS]
+                client_id = tx.get("client_id")
+                try:
+                    if not client_id:
+                        conn.execute(INSERT_TRANSACTION_SQL, params)
+                        saved += 1
+                        continue
+                    cur = conn.execute(
+                        INSERT_KEYED_TRANSACTION_SQL, params + [client_id]
+                    )
+                    if cur.rowcount:
+                        transaction_id = cur.lastrowid
+                        saved += 1
+                    else:
+                        transaction_id = conn.execute(
+                            "SELECT id FROM transactions "
+                            "WHERE user_id = ? AND client_id = ?",
+                            (tx.get("user_id"), client_id),
+                        ).fetchone()[0]
+                    acknowledged.append(
+                        {
+                            "client_id": client_id,
+                            "transaction_id": str(transaction_id),
+                            "duplicate": not cur.rowcount,
+                        }
+                    )
+                except sqlite3.Error as e:
+                    failed.append({"tx": tx, "error": str(e)})
+        return saved, failed, acknowledged
+
+    def import_batch(self, batch, errors: list) -> int:
+        """
+        Insert the chunk in a single transaction. If it is rejected, retry it
+        row by row so only the bad rows are reported.
+        """
+        params = [[tx.get(f) for f in TRANSACTION_FIELDS] for _, tx in batch]
+        with self.connection() as conn:
+            try:
+                with conn:
+                    conn.executemany(INSERT_TRANSACTION_SQL, params)
+                return len(batch)
+            except sqlite3.Error:
+                pass
+
+            saved = 0
+            with conn:
+                for (row_num, _), row in zip(batch, params):
+                    try:
+                        conn.execute(INSERT_TRANSACTION_SQL, row)
+                        saved += 1
+                    except sqlite3.Error as e:
+                        errors.append(f"Row {row_num}: {str(e)}")
+            return saved
+
+    def list_transactions(self, user_id: str, limit: int, position=None) -> tuple:
+        # Fetch a spare row to detect whether another page follows
+        with self.connection() as conn:
+            if position:
+                try:
+                    seek = (position["date"], int(position["id"]))
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError("Invalid cursor")
+                rows = conn.execute(
+                    """SELECT * FROM transactions
+                    WHERE user_id = ? AND (date, id) < (?, ?)
+                    ORDER BY date DESC, id DESC LIMIT ?""",
+                    (user_id, *seek, limit + 1),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    """SELECT * FROM transactions WHERE user_id = ?
+                    ORDER BY date DESC, id DESC LIMIT ?""",
+                    (user_id, limit + 1),
+                ).fetchall()
+
+        items = [dict(r) for r in rows[:limit]]
+        if len(rows) <= limit:
+            return items, None
+        return items, {"date": items[-1]["date"], "id": items[-1]["id"]}
+
+    def changes_since(self, user_id: str, limit: int, position=None) -> tuple:
+        try:
+            after = int(position["seq"]) if position else 0
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        with self.connection() as conn:
+            rows = conn.execute(
+                """SELECT *, CAST(id AS TEXT) AS transaction_id FROM transactions
+                WHERE user_id = ? AND seq > ? ORDER BY seq LIMIT ?""",
+                (user_id, after, limit + 1),
+            ).fetchall()
+
+        items = [dict(r) for r in rows[:limit]]
+        if items:
+            after = items[-1]["seq"]
+        return items, {"seq": after}, len(rows) > limit
+
+    def report_summary(self, user_id: str, cutoff: str) -> dict:
+        """
+        Whole days after the cutoff come from the daily_totals rollup; only
+        the partial first day is aggregated from raw transactions.
+        """
+        cutoff_day = cutoff[:10]
+        next_day = (datetime.fromisoformat(cutoff_day) + timedelta(days=1)).strftime(
+            "%Y-%m-%d"
+        )
+        with self.connection() as conn:
+            rows = conn.execute(
+                REPORT_WINDOW_SQL, (user_id, cutoff_day, user_id, cutoff, next_day)
+            ).fetchall()
+        return fold_daily_totals(tuple(r) for r in rows if r["count"])
+
+    def report_items(self, user_id: str, cutoff: str, limit: int, offset: int):
+        with self.connection() as conn:
+            rows = conn.execute(
+                """SELECT * FROM transactions WHERE user_id = ? AND date >= ?
+                ORDER BY date DESC LIMIT ? OFFSET ?""",
+                (user_id, cutoff, limit, offset),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def rebuild_rollups(self, user_id: str | None = None):
+        with self.connection() as conn:
+            self.db.rebuild_daily_totals(conn, user_id)
+
+    def categories(self) -> list:
+        with self.connection() as conn:
+            rows = conn.execute("SELECT * FROM categories ORDER BY type, name")
+            return [dict(r) for r in rows]
+
+    def add_recurring(self, recurring: dict, occurrences, next_due, active: bool):
+        with self.connection() as conn, conn:
+            cur = conn.execute(
+                """INSERT INTO recurring_transactions
+                (user_id, amount, category, description, frequency, type, tags, start_date, end_date, next_due_date, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    recurring["user_id"],
+                    recurring["amount"],
+                    recurring["category"],
+                    recurring["description"],
+                    recurring["frequency"],
+                    recurring["type"],
+                    recurring["tags"],
+                    recurring["start_date"],
+                    recurring["end_date"],
+                    next_due.isoformat(),
+                    1 if active else 0,
+                ),
+            )
+            conn.executemany(
+                INSERT_TRANSACTION_SQL,
+                [
+                    (
+                        recurring["user_id"],
+                        occurrence.isoformat(),
+                        recurring["amount"],
+                        recurring["category"],
+                        recurring["description"],
+                        recurring["type"],
+                        recurring["tags"],
+                        "One-Off",
+                    )
+                    for occurrence in occurrences
+                ],
+            )
+        return cur.lastrowid
+
+    def list_recurring(self, user_id: str) -> list:
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM recurring_transactions WHERE user_id = ? and is_active = 1",
+                (user_id,),
+            )
+            return [dict(r) for r in rows]
+
+
+class DynamoRepository(Repository):
+    def __init__(self):
+        try:
+            from backend import aws_db
+        except ImportError:
+            import aws_db
+        self.aws_db = aws_db
+
+    def init(self):
+        # Nothing per container: tables are provisioned by SAM and the
+        # default categories are seeded once, not on every cold start
+        pass
+
+    def migrate(self):
+        self.aws_db.init_db()
+        self.aws_db.backfill_updated_at()
+        self.aws_db.backfill_daily_totals()
+
+    def add_transaction(self, tx: dict):
+        return self.aws_db.add_transaction(
+            tx["user_id"],
+            tx["amount"],
+            tx["category"],
+            tx["description"],
+            tx["type"],
+            tx["tags"],
+            tx["frequency"],
+            date=tx.get("date"),
+        )
+
+    def add_transactions(self, transactions: list) -> tuple:
+        return self.aws_db.add_transactions(transactions)
+
+    def import_batch(self, batch, errors: list) -> int:
+        # Ids are assigned here so every failure maps back to exactly one row,
+        # even if the same dict was passed for several rows
+        rows = [
+            (row_num, {**tx, "transaction_id": str(uuid.uuid4())})
+            for row_num, tx in batch
+        ]
+        saved, failed, _ = self.add_transactions([tx for _, tx in rows])
+        failed_ids = {f["transaction_id"]: f["error"] for f in failed}
+        for row_num, tx in rows:
+            if tx["transaction_id"] in failed_ids:
+                errors.append(f"Row {row_num}: {failed_ids[tx['transaction_id']]}")
+        return saved
+
+    @staticmethod
+    def _start_key(key, user_id: str, attributes: tuple):
+        """
+        Check a LastEvaluatedKey that came back from a client before it is
+        handed to DynamoDB, which would fail the request on a foreign one.
+        """
+        if key is None:
+            return None
+        if (
+            not isinstance(key, dict)
+            or set(key) != set(attributes)
+            or not all(isinstance(value, str) for value in key.values())
+            or key["user_id"] != user_id
+        ):
+            raise ValueError("Invalid cursor")
+        return key
+
+    def list_transactions(self, user_id: str, limit: int, position=None) -> tuple:
+        # The cursor is DynamoDB's own LastEvaluatedKey
+        start_key = self._start_key(position, user_id, TABLE_KEY)
+        return self.aws_db.get_transactions_page(user_id, limit, start_key)
+
+    def changes_since(self, user_id: str, limit: int, position=None) -> tuple:
+        # Pages of one sync share the same `after` and resume from the
+        # index key; once drained, the newest updated_at becomes `after`
+        position = position or {}
+        after = position.get("after", "")
+        newest = position.get("newest", after)
+        if not isinstance(after, str) or not isinstance(newest, str):
+            raise ValueError("Invalid cursor")
+        start_key = self._start_key(position.get("key"), user_id, UPDATED_INDEX_KEY)
+        items, last_key = self.aws_db.get_changes_page(user_id, after, limit, start_key)
+        for item in items:
+            newest = max(newest, item.updated_at or "")
+        if last_key:
+            return items, {"after": after, "newest": newest, "key": last_key}, True
+        return items, {"after": newest}, False
+
+    def report_summary(self, user_id: str, cutoff: str) -> dict:
+        return fold_daily_totals(self.aws_db.get_daily_totals(user_id, cutoff[:10]))
+
+    def report_items(self, user_id: str, cutoff: str, limit: int, offset: int):
+        # No index orders a user's items by date, so read the whole window
+        # and page it here, newest first like the SQLite engine
+        rows = self.aws_db.get_transactions_since(user_id, cutoff)
+        rows.sort(key=lambda r: r.date, reverse=True)
+        return rows[offset : offset + limit]
+
+    def rebuild_rollups(self, user_id: str | None = None):
+        if user_id is None:
+            raise ValueError("user_id is required")
+        self.aws_db.rebuild_daily_totals(user_id)
+
+    def categories(self) -> list:
+        rows = self.aws_db.get_categories()
+        if not rows:
+            # Fresh deployment that was never migrated; seeding is cheap, the
+            # updated_at backfill is left to the {"migrate": true} invocation
+            self.aws_db.init_db()
+            rows = self.aws_db.get_categories()
+        return rows
+
+    def add_recurring(self, recurring: dict, occurrences, next_due, active: bool):
+        return self.aws_db.add_recurring_transaction(
+            {
+                **recurring,
+                "next_due_date": next_due.isoformat(),
+                "is_active": active,
+            },
+            occurrences,
+        )
+
+    def list_recurring(self, user_id: str) -> list:
+        return self.aws_db.get_recurring_transactions(user_id)
+
+
+def get_repository() -> Repository:
+    """
+    The storage engine for this process: DynamoDB on Lambda (or when
+    STORAGE_BACKEND=dynamodb, e.g. against DynamoDB Local), SQLite otherwise.
+    """
+    backend = os.getenv("STORAGE_BACKEND")
+    if backend is None:
+        backend = "dynamodb" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "sqlite"
+    if backend == "dynamodb":
+        return DynamoRepository()
+    if backend == "sqlite":
+        return SQLiteRepository()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,37 @@
+import dataclasses
+import json
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """JSON-encode content, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Serializes content as-is, without FastAPI's jsonable_encoder pass.
+    Dataclass records and Decimals are handled natively.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
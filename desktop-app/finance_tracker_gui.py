@@ -3,9 +3,21 @@ from tkinter import ttk, filedialog, messagebox
 import sqlite3
 import requests
 import json
-import threading
 from datetime import datetime
 
+from statement_import import classify_statement, new_summary
+from task_executor import TaskExecutor
+
+# Changes pulled per request during sync
+SYNC_PAGE_SIZE = 500
+# Local rows pushed per request; keeps each body well under the Lambda limit
+UPLOAD_CHUNK_SIZE = 200
+# Transactions view: rows fetched per scroll page, rows kept in the tree at
+# once, and tree inserts per after() tick so the main loop keeps running
+TREE_PAGE_SIZE = 200
+TREE_MAX_ROWS = 600
+TREE_RENDER_BATCH = 50
+
 
 class FinanceTrackerGUI:
     def __init__(self):
@@ -18,7 +30,10 @@ class FinanceTrackerGUI:
         self.aws_api_url = (
             "https://35kdl5sqm4.execute-api.ap-southeast-2.amazonaws.com/Prod"
         )
-        self.sync_thread = None
+        self.sync_task = None
+        self.commit_task = None
+        self.import_task = None
+        self.import_results = []
 
         print("Step 3: Creating widgets...")
         self.create_widgets()
@@ -38,16 +53,18 @@ class FinanceTrackerGUI:
         print("UI should be responsive now - can you click buttons?")
 
     def setup_database_pool(self):
-        """Setup database connection with better performance"""
+        """Start the background executor; it owns the local database"""
+        self.tasks = TaskExecutor(self.root, self._connect_local_db)
+
+    def _connect_local_db(self):
+        """Open and migrate the local cache; runs on the executor's DB thread"""
         try:
-            self.local_conn = sqlite3.connect(
-                "finance_cache.db", check_same_thread=False, timeout=30.0
-            )
-            self.local_conn.execute("PRAGMA journal_mode=WAL")
-            self.local_conn.execute("PRAGMA synchronous=NORMAL")
-            self.local_conn.execute("PRAGMA cache_size=10000")
+            conn = sqlite3.connect("finance_cache.db", timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=10000")
 
-            cursor = self.local_conn.cursor()
+            cursor = conn.cursor()
             cursor.execute(
                 """
             CREATE TABLE IF NOT EXISTS transactions (
@@ -62,88 +79,133 @@ class FinanceTrackerGUI:
                 )
             """
             )
-            self.local_conn.commit()
+            self._migrate_local_schema(cursor)
+            conn.commit()
             print("Database initialized successfully")
+            return conn
         except Exception as e:
             print(f"Database setup error: {e}")
 
-            self.local_conn = sqlite3.connect("finance_cache.db")
+            return sqlite3.connect("finance_cache.db")
+
+    def _migrate_local_schema(self, cursor):
+        """Add the sync columns to caches created by older versions"""
+        cursor.execute("PRAGMA table_info(transactions)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if "remote_id" not in columns:
+            cursor.execute("ALTER TABLE transactions ADD COLUMN remote_id TEXT")
+        if "client_id" not in columns:
+            cursor.execute("ALTER TABLE transactions ADD COLUMN client_id TEXT")
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_remote_id "
+            "ON transactions (remote_id)"
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_client_id "
+            "ON transactions (client_id)"
+        )
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT)"
+        )
+        # Keyset paging for the transactions view
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transactions_date_id "
+            "ON transactions (COALESCE(date, ''), id)"
+        )
 
     def load_transactions(self):
         """Load from local cache first, then sync with AWS"""
         
         try:
 
-            local_transactions = self.get_local_transactions()
-            self.display_transactions(local_transactions)
+            self.refresh_transactions_view()
 
             if hasattr(self, "sync_status_label") and self.sync_status_label:
                 self.sync_status_label.config(text="Loading...", foreground="blue")
 
-            if self.sync_thread is None or not self.sync_thread.is_alive():
-                self.sync_thread = threading.Thread(
-                    target=self.sync_with_aws, daemon=True
+            if self.sync_task is None or self.sync_task.done():
+                self.sync_task = self.tasks.submit(
+                    self.sync_with_aws,
+                    on_done=lambda _: self.refresh_after_sync(),
+                    on_error=self.sync_failed,
+                    on_progress=self.show_progress,
                 )
-                self.sync_thread.start()
         except Exception as e:
             print(f"Error loading transactions: {e}")
             if hasattr(self, "sync_status_label") and self.sync_status_label:
                 self.sync_status_label.config(text=f"Error: {e}", foreground="red")
 
-    def get_local_transactions(self):
-        """Get transactions from local SQLite"""
-        try:
-            cursor = self.local_conn.cursor()
-            cursor.execute(
-                """
-            SELECT date, description, amount, category, type 
-            FROM transactions 
-            ORDER BY date DESC
+    def get_local_transactions(
+        self,
+        conn,
+        older_than=None,
+        newer_than=None,
+        limit=TREE_PAGE_SIZE,
+        inclusive=False,
+    ):
         """
-            )
-            transactions = []
-            for row in cursor.fetchall():
-                transactions.append(
-                    {
-                        "date": row[0],
-                        "description": row[1],
-                        "amount": row[2],
-                        "category": row[3],
-                        "type": row[4],
-                    }
+        One page of local transactions, newest first. Pages are keyed on
+        (date, id) rather than OFFSET, so a deep page costs the same as the
+        first one. Rows are (id, date, description, amount, category, type,
+        date_key).
+        """
+        try:
+            query = """
+                SELECT id, date, description, amount, category, type,
+                    COALESCE(date, '')
+                FROM transactions
+            """
+            params = []
+            # The lone date bound lets SQLite seek the index; the row value
+            # comparison alone makes it scan from the start
+            if older_than is not None:
+                op = "<=" if inclusive else "<"
+                query += (
+                    " WHERE COALESCE(date, '') <= ?"
+                    f" AND (COALESCE(date, ''), id) {op} (?, ?)"
+                )
+                params.extend((older_than[0], *older_than))
+            elif newer_than is not None:
+                query += (
+                    " WHERE COALESCE(date, '') >= ?"
+                    " AND (COALESCE(date, ''), id) > (?, ?)"
                 )
-            return transactions
+                params.extend((newer_than[0], *newer_than))
+            order = "ASC" if newer_than is not None else "DESC"
+            query += f" ORDER BY COALESCE(date, '') {order}, id {order} LIMIT ?"
+            params.append(limit)
+
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return rows[::-1] if newer_than is not None else rows
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             return []
-        except Exception as e:
-            print(f"Unexcepted error: {e}")
-            return []
 
-    def sync_with_aws(self):
-        """Background worker for AWS Sync"""
-        try:
-            self.root.after(0, lambda: self.update_sync_status("Syncing...."))
-
-            response = requests.get(f"{self.aws_api_url}/transactions", timeout=10)
-            if response.status_code == 200:
-                aws_transactions = response.json()
-                self._merge_transactions(aws_transactions)
-                self._upload_local_changes()
-                self.root.after(0, self.refresh_after_sync)
-            else:
-                self.root.after(
-                    0,
-                    lambda: self.update_sync_status(
-                        f"Sync failed: {response.status_code}"
-                    ),
-                )
-        except requests.exceptions.Timeout:
-            self.root.after(
-                0, lambda: self.update_sync_status(f"Sync timeout - check connection")
-            )
-        except Exception as e:
-            self.root.after(0, lambda: self.update_sync_status(f"Sync Error: {e}"))
+    def sync_with_aws(self, task):
+        """Background task for AWS Sync"""
+        task.progress(0, message="Syncing....")
+        self._pull_changes(task)
+        self._upload_local_changes(task)
+
+    def sync_failed(self, e):
+        if isinstance(e, requests.exceptions.HTTPError):
+            self.update_sync_status(f"Sync failed: {e.response.status_code}")
+        elif isinstance(e, requests.exceptions.Timeout):
+            self.update_sync_status("Sync timeout - check connection")
+        else:
+            self.update_sync_status(f"Sync Error: {e}")
+
+    def show_progress(self, done, total, message):
+        self.update_sync_status(message)
+
+    def cancel_background_work(self):
+        """Stop the running sync, commit or import after its current step"""
+        for task in (self.sync_task, self.commit_task, self.import_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self.update_sync_status("Cancelled")
 
     def update_sync_status(self, message):
         if hasattr(self, "sync_status_label"):
@@ -151,67 +213,183 @@ class FinanceTrackerGUI:
 
     def refresh_after_sync(self):
         """Refresh transactions after successful sync"""
-        local_transactions = self.get_local_transactions()
-        self.display_transactions(local_transactions)
+        self.refresh_transactions_view()
         self.update_sync_status("Sync Complete")
 
-    def _merge_transactions(self, aws_transactions):
-        """Merge AWS transactions with local ones"""
-        cursor = self.local_conn.cursor()
-
-        cursor.execute("SELECT date, amount, description FROM transactions")
-
-        existing = set()
-        for row in cursor.fetchall():
-            existing.add((row[0], row[1], row[2]))
+    def _pull_changes(self, task):
+        """Page through server-side changes since the stored watermark"""
+        since = self.tasks.call_db(self._get_sync_state, "transactions_since")
+        pulled = 0
+        while True:
+            task.check()
+            params = {"user_id": "default", "limit": SYNC_PAGE_SIZE}
+            if since:
+                params["since"] = since
+            response = requests.get(
+                f"{self.aws_api_url}/transactions/changes", params=params, timeout=10
+            )
+            response.raise_for_status()
+            page = response.json()
+            since = page["since"]
+            self.tasks.call_db(self._apply_changes, page["items"], since)
+            pulled += len(page["items"])
+            task.progress(pulled, message=f"Pulled {pulled} changes")
+            if not page["has_more"]:
+                return
+
+    def _get_sync_state(self, conn, name):
+        cursor = conn.cursor()
+        cursor.execute("SELECT value FROM sync_state WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _apply_changes(self, conn, changes, since):
+        """
+        Upsert one page of server changes by transaction id and advance the
+        watermark in the same transaction, so an interrupted sync resumes
+        from the last applied page.
+        """
+        with conn:
+            cursor = conn.cursor()
+            for tx in changes:
+                values = (
+                    tx["date"],
+                    tx["amount"],
+                    tx["description"],
+                    tx["category"],
+                    tx["type"],
+                )
+                cursor.execute(
+                    """
+                    UPDATE transactions
+                    SET date = ?, amount = ?, description = ?, category = ?, type = ?,
+                        synced = 1
+                    WHERE remote_id = ?
+                    """,
+                    (*values, tx["transaction_id"]),
+                )
+                if cursor.rowcount:
+                    continue
+
+                # Our own upload whose acknowledgement never arrived
+                if tx.get("client_id"):
+                    cursor.execute(
+                        """
+                        UPDATE transactions
+                        SET date = ?, amount = ?, description = ?, category = ?,
+                            type = ?, synced = 1, remote_id = ?
+                        WHERE client_id = ?
+                        """,
+                        (*values, tx["transaction_id"], tx["client_id"]),
+                    )
+                    if cursor.rowcount:
+                        continue
 
-        new_transactions = []
-        for tx in aws_transactions:
-            key = (tx["date"], tx["amount"], tx["description"])
-            if key not in existing:
-                new_transactions.append(
-                    (
-                        tx["date"],
-                        tx["amount"],
-                        tx["description"],
-                        tx["category"],
-                        tx["type"],
-                        1,
+                # Rows pulled or uploaded before they had a remote id
+                cursor.execute(
+                    """
+                    UPDATE transactions SET remote_id = ?, category = ?, type = ?
+                    WHERE id = (
+                        SELECT id FROM transactions
+                        WHERE remote_id IS NULL AND synced = 1
+                            AND date IS ? AND amount IS ? AND description IS ?
+                        LIMIT 1
                     )
+                    """,
+                    (tx["transaction_id"], tx["category"], tx["type"], *values[:3]),
                 )
-        if new_transactions:
-            cursor.executemany(
-                "INSERT INTO transactions (date, amount, description, category, type, synced) VALUES (?, ?, ?, ?, ?, ?)",
-                new_transactions,
-            )
-            self.local_conn.commit()
-
-    def _upload_local_changes(self):
-        """Upload unsynced local transactions to AWS"""
-        cursor = self.local_conn.cursor()
-        cursor.execute("SELECT * FROM transactions WHERE synced = 0")
-
-        unsynced = cursor.fetchall()
-        if unsynced:
-            transactions = []
-            for row in unsynced:
-                transactions.append(
-                    {
-                        "date": row[1],
-                        "amount": row[2],
-                        "description": row[3],
-                        "category": row[4],
-                        "type": row[5],
-                    }
+                if cursor.rowcount:
+                    continue
+
+                cursor.execute(
+                    """
+                    INSERT INTO transactions
+                        (date, amount, description, category, type, synced, remote_id)
+                    VALUES (?, ?, ?, ?, ?, 1, ?)
+                    """,
+                    (*values, tx["transaction_id"]),
                 )
+            cursor.execute(
+                "INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)",
+                ("transactions_since", since),
+            )
+
+    def _upload_local_changes(self, task):
+        """
+        Upload unsynced local transactions in chunks. Each row gets a
+        client_id that is committed before it is sent, so a retried chunk is
+        deduplicated by the server; only the rows the server acknowledges
+        are marked as synced. Returns the number of acknowledged rows.
+        """
+        total = self.tasks.call_db(self._count_unsynced)
+        acknowledged, last_id = 0, 0
+        while True:
+            task.check()
+            chunk = self.tasks.call_db(self._next_upload_chunk, last_id)
+            if not chunk:
+                return acknowledged
+            last_id = chunk[-1][0]
+
+            transactions = [
+                {
+                    "user_id": "default",
+                    "date": row[1],
+                    "amount": row[2],
+                    "description": row[3] or "",
+                    "category": row[4],
+                    "type": row[5],
+                    "client_id": row[6],
+                }
+                for row in chunk
+            ]
             response = requests.post(
-                f"{self.aws_api_url}/transactions/commit-bulk",
+                f"{self.aws_api_url}/transaction/commit-bulk",
                 json={"transactions": transactions},
+                timeout=30,
+            )
+            response.raise_for_status()
+
+            acks = response.json().get("acknowledged", [])
+            self.tasks.call_db(self._mark_acknowledged, acks)
+            acknowledged += len(acks)
+            task.progress(
+                acknowledged, total, f"Uploaded {acknowledged}/{total} transactions"
             )
 
-            if response.status_code == 200:
-                cursor.execute("UPDATE transactions SET synced = 1")
-                self.local_conn.commit()
+    def _count_unsynced(self, conn):
+        return conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE synced = 0"
+        ).fetchone()[0]
+
+    def _next_upload_chunk(self, conn, last_id):
+        """The next unsynced rows after last_id, with client ids assigned"""
+        with conn:
+            conn.execute(
+                """
+                UPDATE transactions SET client_id = lower(hex(randomblob(16)))
+                WHERE synced = 0 AND client_id IS NULL AND id > ?
+                """,
+                (last_id,),
+            )
+        return conn.execute(
+            """
+            SELECT id, date, amount, description, category, type, client_id
+            FROM transactions
+            WHERE synced = 0 AND id > ?
+            ORDER BY id LIMIT ?
+            """,
+            (last_id, UPLOAD_CHUNK_SIZE),
+        ).fetchall()
+
+    def _mark_acknowledged(self, conn, acks):
+        with conn:
+            conn.executemany(
+                """
+                UPDATE transactions SET synced = 1, remote_id = ?
+                WHERE client_id = ?
+                """,
+                [(ack["transaction_id"], ack["client_id"]) for ack in acks],
+            )
 
     def create_widgets(self):
         print("Creating notebook...")
@@ -278,15 +456,23 @@ class FinanceTrackerGUI:
         # Add the treeview back
         print("Creating treeview...")
         columns = ("Date", "Description", "Amount", "Category", "Type")
+        tree_frame = ttk.Frame(self.transactions_frame)
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
         self.transactions_tree = ttk.Treeview(
-            self.transactions_frame, columns=columns, show="headings"
+            tree_frame, columns=columns, show="headings"
+        )
+        self.transactions_scrollbar = ttk.Scrollbar(
+            tree_frame, orient="vertical", command=self.transactions_tree.yview
         )
+        self.transactions_tree.configure(yscrollcommand=self._on_tree_scroll)
 
         for col in columns:
             self.transactions_tree.heading(col, text=col)
             self.transactions_tree.column(col, width=120)
 
-        self.transactions_tree.pack(fill="both", expand=True, padx=10, pady=5)
+        self.transactions_scrollbar.pack(side="right", fill="y")
+        self.transactions_tree.pack(side="left", fill="both", expand=True)
+        self._reset_tree_window()
         print("Treeview created")
 
         print("Creating load button...")
@@ -303,6 +489,12 @@ class FinanceTrackerGUI:
         self.sync_status_label.pack(pady=5)
         print("Status label created")
 
+        ttk.Button(
+            self.transactions_frame,
+            text="Cancel",
+            command=self.cancel_background_work,
+        ).pack(pady=5)
+
     def setup_csv_import(self):
         ttk.Label(
             self.csv_frame, text="Smart CSV Import", font=("Arial", 14, "bold")
@@ -326,6 +518,12 @@ class FinanceTrackerGUI:
             command=self.import_csv_smart,
         ).pack(pady=20)
 
+        self.import_status_label = ttk.Label(self.csv_frame, text="")
+        self.import_status_label.pack(pady=5)
+        ttk.Button(
+            self.csv_frame, text="Cancel", command=self.cancel_background_work
+        ).pack(pady=5)
+
         self.results_text = tk.Text(self.csv_frame, height=15, width=80)
         self.results_text.pack(fill="both", expand=True, padx=10, pady=5)
 
@@ -341,106 +539,260 @@ class FinanceTrackerGUI:
         if not file_path:
             messagebox.showerror("Error", "Please select a file")
             return
-        try:
-            with open(file_path, "rb") as f:
-                files = {"file": f}
-                data = {"user_id": "default"}
-
-                response = requests.post(
-                    f"{self.aws_api_url}/import-bank-csv", files=files, data=data
-                )
-                if response.status_code != 200:
-
-                    f.seek(0)
-                    response = requests.post(
-                        f"{self.aws_api_url}/import-csv-smart", files=files, data=data
-                    )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    self.display_import_results(result)
-                else:
-                    messagebox.showerror("Error", f"Import failed: {response.text}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Import error: {str(e)}")
-
-    def display_import_results(self, result):
+        if self.import_task is not None and not self.import_task.done():
+            return
+        self.import_results = []
         self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, "Transactions:\n")
+        self.import_task = self.tasks.submit(
+            self._classify_statement,
+            file_path,
+            on_done=self.display_import_results,
+            on_error=lambda e: messagebox.showerror("Error", f"Import error: {e}"),
+            on_progress=lambda done, total, message: self.import_status_label.config(
+                text=message
+            ),
+        )
 
-        summary = result["summary"]
-        self.results_text.insert(tk.END, f"Import Results:\n")
-        self.results_text.insert(tk.END, f"Total: {summary['total']}\n")
+    def _classify_statement(self, task, file_path):
+        """
+        Background task: parse and classify the statement locally with the
+        shared classifier, handing each chunk to the UI as it is ready.
+        Nothing is sent upstream until the results are committed.
+        """
+        summary = new_summary()
+        for chunk in classify_statement(file_path, summary):
+            task.check()
+            self.tasks.call_soon(self.append_import_results, chunk)
+            task.progress(
+                summary["total"], message=f"Classified {summary['total']} transactions"
+            )
+        return summary
+
+    def append_import_results(self, transactions):
+        self.import_results.extend(transactions)
         self.results_text.insert(
-            tk.END, f"Auto-classified: {summary['auto_classified']}\n"
+            tk.END,
+            "".join(
+                f"{'[review] ' if tx['classification']['needs_review'] else ''}"
+                f"{tx['description']} → {tx['category']} (${tx['amount']})\n"
+                for tx in transactions
+            ),
         )
-        self.results_text.insert(tk.END, f"Needs Review: {summary['needs_review']}\n\n")
 
-        self.results_text.insert(tk.END, "Transactions:\n")
-        for tx in result["transactions"]:
-            self.results_text.insert(
-                tk.END, f"{tx['description']} → {tx['category']} (${tx['amount']})\n"
-            )
+    def display_import_results(self, summary):
+        self.import_status_label.config(text="")
+        self.results_text.insert(
+            1.0,
+            f"Import Results:\n"
+            f"Total: {summary['total']}\n"
+            f"Auto-classified: {summary['auto-classified']}\n"
+            f"Needs Review: {summary['needs_review']}\n"
+            f"Skipped: {summary['skipped']}\n\n",
+        )
 
-            if messagebox.askyesno(
-                "Commit", "Do you want to commit these transactions?"
-            ):
-                self.commit_transactions(result["transactions"])
+        if self.import_results and messagebox.askyesno(
+            "Commit", "Do you want to commit these transactions?"
+        ):
+            self.commit_transactions(self.import_results)
+            self.import_results = []
 
     def commit_transactions(self, transactions):
-        try:
-            cursor = self.local_conn.cursor()
-            for tx in transactions:
-                cursor.execute(
-                    """
-                    INSERT INTO transactions (date, amount, description, category, type, synced)
-                    VALUES (?, ?, ?, ?, ?, 0)
+        self.commit_task = self.tasks.submit(
+            self._commit_and_upload,
+            transactions,
+            on_done=self._commit_done,
+            on_error=self._commit_failed,
+            on_progress=self.show_progress,
+        )
+
+    def _commit_and_upload(self, task, transactions):
+        """Background task: store the rows locally, then push them upstream"""
+        self.tasks.call_db(self._insert_local, transactions)
+        return self._upload_local_changes(task)
+
+    def _insert_local(self, conn, transactions):
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO transactions (date, amount, description, category, type, synced)
+                VALUES (?, ?, ?, ?, ?, 0)
                 """,
+                [
                     (
                         tx["date"],
                         tx["amount"],
                         tx["description"],
                         tx["category"],
                         tx["type"],
-                    ),
-                )
-            self.local_conn.commit()
-
-            response = requests.post(
-                f"{self.aws_api_url}/transactions/commit-bulk",
-                json={"transactions": transactions},
+                    )
+                    for tx in transactions
+                ],
             )
 
-            if response.status_code == 200:
-                result = response.json()
-                cursor.execute("UPDATE transactions SET synced = 1 WHERE synced = 0")
-                self.local_conn.commit()
-                messagebox.showinfo(
-                    "Success", f"Committed {result['saved']} transactions!"
-                )
-                self.refresh_dashboard()
-            else:
-                messagebox.showerror("Error", f"Commit Failed: {response.text}")
-        except Exception as e:
+    def _commit_done(self, saved):
+        messagebox.showinfo("Success", f"Committed {saved} transactions!")
+        self.refresh_dashboard()
+
+    def _commit_failed(self, e):
+        if isinstance(e, requests.exceptions.RequestException):
+            messagebox.showerror(
+                "Error", f"Commit Failed: {e} - unsent rows will retry on next sync"
+            )
+        else:
             messagebox.showerror("Error", f"Commit error: {str(e)}")
 
-    def display_transactions(self, transactions):
-        """Display transactions in the treeview widget"""
+    def _reset_tree_window(self):
+        # Rows currently in the tree by iid (the local id), and whether more
+        # rows exist past either end of the loaded window
+        self._tree_rows = {}
+        self._tree_more_older = True
+        self._tree_more_newer = False
+        self._tree_loading = False
+        self._tree_render_job = None
 
-        for item in self.transactions_tree.get_children():
-            self.transactions_tree.delete(item)
+    def _tree_window(self):
+        return [self._tree_rows[iid] for iid in self.transactions_tree.get_children()]
 
-        for tx in transactions:
-            self.transactions_tree.insert(
-                "",
-                "end",
-                values=(
-                    tx["date"],
-                    tx["description"],
-                    f"${tx['amount']:.2f}",
-                    tx["category"],
-                    tx["type"],
-                ),
-            )
+    @staticmethod
+    def _tree_values(row):
+        return (row[1], row[2], f"${row[3] or 0:.2f}", row[4], row[5])
+
+    @staticmethod
+    def _tree_key(row):
+        return (row[6], row[0])
+
+    def refresh_transactions_view(self):
+        """
+        Re-read the loaded window and apply only the differences, keeping
+        the scroll position. Only the window's rows are queried.
+        """
+        window = self._tree_window()
+        limit = min(max(len(window), TREE_PAGE_SIZE), TREE_MAX_ROWS)
+        older_than = None
+        if window and self._tree_more_newer:
+            older_than = self._tree_key(window[0])
+
+        def loaded(rows):
+            self._tree_more_older = len(rows) == limit
+            self._show_rows(rows)
+
+        self._load_tree_rows(loaded, older_than=older_than, limit=limit, inclusive=True)
+
+    def _load_tree_rows(self, on_done, **window):
+        """Query a page for the tree on the DB thread; on_done gets the rows"""
+        self._tree_loading = True
+        self.tasks.run_db(
+            lambda conn: self.get_local_transactions(conn, **window),
+            on_done=on_done,
+            on_error=self._tree_load_failed,
+        )
+
+    def _tree_load_failed(self, e):
+        self._tree_loading = False
+        print(f"Error loading transactions: {e}")
+
+    def _on_tree_scroll(self, first, last):
+        """Scrollbar callback; loads the next page at either end of the window"""
+        self.transactions_scrollbar.set(first, last)
+        if self._tree_loading or not self._tree_rows:
+            return
+        if float(last) >= 1.0 and self._tree_more_older:
+            self._load_older()
+        elif float(first) <= 0.0 and self._tree_more_newer:
+            self._load_newer()
+
+    def _load_older(self):
+        window = self._tree_window()
+        self._load_tree_rows(
+            lambda rows: self._extend_older(window, rows),
+            older_than=self._tree_key(window[-1]),
+        )
+
+    def _extend_older(self, window, rows):
+        self._tree_more_older = len(rows) == TREE_PAGE_SIZE
+        if not rows:
+            self._tree_loading = False
+            return
+        # Drop rows off the top once the window is full
+        window += rows
+        trimmed = max(len(window) - TREE_MAX_ROWS, 0)
+        if trimmed:
+            self._tree_more_newer = True
+        self._show_rows(window[trimmed:])
+        if trimmed:
+            self.transactions_tree.yview_scroll(-trimmed, "units")
+
+    def _load_newer(self):
+        window = self._tree_window()
+        self._load_tree_rows(
+            lambda rows: self._extend_newer(window, rows),
+            newer_than=self._tree_key(window[0]),
+        )
+
+    def _extend_newer(self, window, rows):
+        self._tree_more_newer = len(rows) == TREE_PAGE_SIZE
+        if not rows:
+            self._tree_loading = False
+            return
+        window = rows + window
+        if len(window) > TREE_MAX_ROWS:
+            self._tree_more_older = True
+        # Keep the rows that were on screen in view once the new ones land
+        self._show_rows(
+            window[:TREE_MAX_ROWS],
+            on_done=lambda: self.transactions_tree.yview_scroll(len(rows), "units"),
+        )
+
+    def _show_rows(self, rows, on_done=None):
+        """
+        Make the tree show exactly `rows`, in order. Rows that are gone are
+        deleted, changed rows are updated in place and existing rows are
+        reordered at once; new rows are inserted TREE_RENDER_BATCH at a time
+        from after() callbacks.
+        """
+        tree = self.transactions_tree
+        if self._tree_render_job is not None:
+            self.root.after_cancel(self._tree_render_job)
+            self._tree_render_job = None
+
+        wanted = {str(row[0]) for row in rows}
+        stale = [iid for iid in tree.get_children() if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                del self._tree_rows[iid]
+
+        # Existing rows take their order among themselves now; inserting the
+        # new rows in ascending position then yields the final order
+        pending, position = [], 0
+        for index, row in enumerate(rows):
+            iid = str(row[0])
+            if iid not in self._tree_rows:
+                pending.append((index, iid, row))
+                continue
+            if self._tree_rows[iid] != row:
+                tree.item(iid, values=self._tree_values(row))
+                self._tree_rows[iid] = row
+            tree.move(iid, "", position)
+            position += 1
+
+        self._tree_loading = True
+
+        def render(start=0):
+            for index, iid, row in pending[start : start + TREE_RENDER_BATCH]:
+                tree.insert("", index, iid=iid, values=self._tree_values(row))
+                self._tree_rows[iid] = row
+            start += TREE_RENDER_BATCH
+            if start < len(pending):
+                self._tree_render_job = self.root.after(1, render, start)
+                return
+            self._tree_render_job = None
+            self._tree_loading = False
+            if on_done:
+                on_done()
+
+        render()
 
     def refresh_dashboard(self):
         self.load_transactions()
@@ -449,8 +801,8 @@ class FinanceTrackerGUI:
         try:
             self.root.mainloop()
         finally:
-            if hasattr(self, "local_conn"):
-                self.local_conn.close()
+            if hasattr(self, "tasks"):
+                self.tasks.shutdown()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 from setuptools import setup
 
+# Build with `make app`, which first copies the backend modules the
+# statement import shares (classifier, statement_parser) next to this file
+
 APP = ["finance_tracker_gui.py"]
 DATA_FILES = []
 OPTIONS = {
@@ -13,7 +16,14 @@ OPTIONS = {
         "NSHighResolutionCapable": True,
         "LSUIElement": True,
     },
-    "includes": ["tkinter", "tkinter.ttk", "tkinter.filedialog", "tkinter.messagebox"],
+    "includes": [
+        "tkinter",
+        "tkinter.ttk",
+        "tkinter.filedialog",
+        "tkinter.messagebox",
+        "classifier",
+        "statement_parser",
+    ],
     "excludes": ["matplotlib", "numpy", "scipy"],
 }
 
@@ -0,0 +1,26 @@
+import csv
+
+# Copied in from ../backend by `make shared`; see Makefile
+from statement_parser import classify_chunks, new_summary, parse_rows, row_parser
+
+# Rows classified and handed to the UI at a time
+IMPORT_CHUNK_SIZE = 500
+
+
+def iter_statement_rows(path, summary):
+    """
+    Stream (date, amount, description) rows from a bank export or a plain
+    date,amount,description CSV. Rows that cannot be parsed are counted in
+    summary["skipped"].
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        yield from parse_rows(reader, row_parser(reader.fieldnames), summary)
+
+
+def classify_statement(path, summary, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Parse and classify a statement locally, yielding lists of at most
+    chunk_size transactions as they are ready and updating summary.
+    """
+    yield from classify_chunks(iter_statement_rows(path, summary), summary, chunk_size)
@@ -0,0 +1,207 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+# Threads for network calls and other slow work
+WORKER_THREADS = 4
+# How often the Tk loop picks up finished work
+POLL_MS = 50
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task once it has been cancelled."""
+
+
+class Task:
+    """
+    Handle for submitted work. The task function receives it to report
+    progress and to check for cancellation between steps; the UI uses it
+    to cancel.
+    """
+
+    def __init__(self, executor, name, on_progress=None):
+        self.name = name
+        self.future = None
+        self._executor = executor
+        self._on_progress = on_progress
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def check(self):
+        """Stop here if the task was cancelled."""
+        if self.cancelled:
+            raise TaskCancelled(self.name)
+
+    def progress(self, done, total=None, message=""):
+        """Report progress; on_progress(done, total, message) runs on the UI."""
+        self.check()
+        if self._on_progress is not None:
+            self._executor.call_soon(self._on_progress, done, total, message)
+
+
+class TaskExecutor:
+    """
+    Runs the desktop app's blocking work off the Tk main thread.
+
+    Network and other slow work goes to a small worker pool. All SQLite
+    access goes through one DB thread that owns the only connection, so
+    statements from the UI, the sync and imports are serialized. Results
+    are queued and handed to callbacks from root.after, so callbacks may
+    touch widgets.
+    """
+
+    def __init__(self, root, connect, workers=WORKER_THREADS):
+        self.root = root
+        self._results = queue.Queue()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="desktop-worker"
+        )
+        self._tasks = set()
+        self._db_jobs = queue.Queue()
+        # Guards _closed, so no DB job is queued behind the shutdown sentinel
+        self._db_lock = threading.Lock()
+        self._closed = False
+        self._db_thread = threading.Thread(
+            target=self._db_loop, args=(connect,), name="desktop-db", daemon=True
+        )
+        self._db_thread.start()
+        self._poll_job = self.root.after(POLL_MS, self._drain)
+
+    def submit(
+        self, fn, *args, name=None, on_done=None, on_error=None, on_progress=None
+    ):
+        """
+        Run fn(task, *args) on the worker pool. on_done(result) or
+        on_error(exception) runs on the UI thread; neither runs once the
+        task is cancelled.
+        """
+        task = Task(self, name or fn.__name__, on_progress)
+        task.future = self._pool.submit(fn, task, *args)
+        self._track(task, on_done, on_error)
+        return task
+
+    def run_db(self, fn, *args, on_done=None, on_error=None):
+        """
+        Run fn(conn, *args) on the DB thread, reporting like submit. Raises
+        TaskCancelled after shutdown.
+        """
+        task = Task(self, fn.__name__)
+        task.future = self._db_future(fn, args)
+        self._track(task, on_done, on_error)
+        return task
+
+    def call_db(self, fn, *args):
+        """
+        Run fn(conn, *args) on the DB thread and wait for its result. Only
+        for task functions running on the worker pool; the UI thread uses
+        run_db instead. Raises TaskCancelled once the executor is shut down,
+        including for a call that was still queued.
+        """
+        return self._db_future(fn, args).result()
+
+    def call_soon(self, fn, *args):
+        """Queue fn(*args) to run on the UI thread."""
+        self._results.put((fn, args))
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    def shutdown(self):
+        """Cancel outstanding work and close the DB connection."""
+        self.cancel_all()
+        try:
+            self.root.after_cancel(self._poll_job)
+        except tk.TclError:
+            # The window is already gone
+            pass
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._db_lock:
+            self._closed = True
+            self._db_jobs.put(None)
+        self._db_thread.join(timeout=5)
+
+    def _db_future(self, fn, args):
+        with self._db_lock:
+            if self._closed:
+                raise TaskCancelled(fn.__name__)
+            future = Future()
+            self._db_jobs.put((future, fn, args))
+        return future
+
+    def _db_loop(self, connect):
+        conn = connect()
+        try:
+            while True:
+                job = self._db_jobs.get()
+                if job is None:
+                    return
+                future, fn, args = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(fn(conn, *args))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            conn.close()
+            self._cancel_db_jobs()
+
+    def _cancel_db_jobs(self):
+        """Fail whatever is still queued once the DB thread stops."""
+        with self._db_lock:
+            self._closed = True
+        while True:
+            try:
+                job = self._db_jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is None:
+                continue
+            future, fn, _ = job
+            if future.set_running_or_notify_cancel():
+                future.set_exception(TaskCancelled(fn.__name__))
+
+    def _track(self, task, on_done, on_error):
+        self._tasks.add(task)
+
+        def finished(future):
+            self._tasks.discard(task)
+            if task.cancelled or future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                if on_done is not None:
+                    self.call_soon(on_done, future.result())
+            elif isinstance(error, (TaskCancelled, CancelledError)):
+                return
+            elif on_error is not None:
+                self.call_soon(on_error, error)
+            else:
+                print(f"{task.name} failed: {error}")
+
+        task.future.add_done_callback(finished)
+
+    def _drain(self):
+        try:
+            while True:
+                fn, args = self._results.get_nowait()
+                try:
+                    fn(*args)
+                except Exception as e:
+                    print(f"Callback error: {e}")
+        except queue.Empty:
+            pass
+        self._poll_job = self.root.after(POLL_MS, self._drain)
@@ -86,24 +86,40 @@ async function loadDashboard() {
 }
 
 // Transaction Functions
-async function loadTransactions() {
+let transactionsCursor = null
+let loadedTransactions = []
+
+async function loadTransactions(append = false) {
   try {
     showStatus('Loading transactions...', 'info')
 
     const user_id = document.getElementById('user-filter').value || 'test_user'
     const limit = document.getElementById('limit-filter').value || 20
 
-    const response = await apiCall(
-      `/transactions?user_id=${user_id}&limit=${limit}`
-    )
+    let endpoint = `/transactions?user_id=${user_id}&limit=${limit}`
+    if (append && transactionsCursor) {
+      endpoint += `&cursor=${encodeURIComponent(transactionsCursor)}`
+    }
+    const response = await apiCall(endpoint)
 
-    displayTransactions(response.items)
+    loadedTransactions = append
+      ? loadedTransactions.concat(response.items)
+      : response.items
+    transactionsCursor = response.next_cursor
+
+    displayTransactions(loadedTransactions)
+    document.getElementById('load-more-transactions').style.display =
+      transactionsCursor ? 'inline-block' : 'none'
     showStatus('Transactions loaded successfully!', 'success')
   } catch (error) {
     showStatus('Failed to load transactions', 'error')
   }
 }
 
+function loadMoreTransactions() {
+  loadTransactions(true)
+}
+
 function displayTransactions(transactions) {
   const container = document.getElementById('transactions-list')
 
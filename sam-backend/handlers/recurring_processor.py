@@ -1,15 +1,42 @@
 import json
 import boto3
 import os
+import threading
 import uuid
-import requests
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from decimal import Decimal
 
+# Shared with the API through SharedModulesLayer
+from notifier import Notifier, telegram_from_env
+from recurrence import DUE_SHARDS, catch_up, due_shard
+
 # Initialize DynamoDB
 dynamodb = boto3.resource("dynamodb")
 recurring_table = dynamodb.Table(os.environ["RECURRING_TABLE"])
 transactions_table = dynamodb.Table(os.environ["TRANSACTIONS_TABLE"])
+DAILY_TOTALS_TABLE = os.environ.get("DAILY_TOTALS_TABLE", "FinanceTracker-DailyTotals")
+
+# Bounded fan-out for the per-item update_item calls
+MAX_WORKERS = int(os.environ.get("RECURRING_MAX_WORKERS", "16"))
+# Sparse GSI over active items: due_shard is only set while is_active, and
+# next_due_day sorts so each run can read just the buckets up to today
+DUE_INDEX = os.environ.get("RECURRING_DUE_INDEX", "DueIndex")
+# Lines listed individually in the digest before it is summarised
+DIGEST_MAX_LINES = 20
+
+_thread_local = threading.local()
+
+notifier = Notifier(telegram_from_env(parse_mode="Markdown"), coalesce_window=0)
+
+
+def _thread_tables():
+    """boto3 resources are not thread safe, so each worker gets its own"""
+    if not hasattr(_thread_local, "recurring_table"):
+        resource = boto3.session.Session().resource("dynamodb")
+        _thread_local.recurring_table = resource.Table(os.environ["RECURRING_TABLE"])
+        _thread_local.daily_totals_table = resource.Table(DAILY_TOTALS_TABLE)
+    return _thread_local.recurring_table, _thread_local.daily_totals_table
 
 
 def lambda_handler(event, context):
@@ -17,47 +44,117 @@ def lambda_handler(event, context):
     Process recurring transactions and create new transactions
     """
     try:
-        # Get all active recurring transactions
-        response = recurring_table.scan(
-            FilterExpression="is_active = :active",
-            ExpressionAttributeValues={":active": True},
-        )
+        if event and event.get("backfill_due_index"):
+            updated = backfill_due_index()
+            return {"statusCode": 200, "body": json.dumps({"backfilled": updated})}
 
-        recurring_transactions = response.get("Items", [])
-        processed_count = 0
+        processed, ended = [], []
+        today = datetime.utcnow().strftime("%Y-%m-%d")
 
-        for recurring in recurring_transactions:
-            if should_process_recurring(recurring):
-                # Create new transaction
-                create_transaction_from_recurring(recurring)
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            for page in iter_due_recurring_pages(today):
+                due = [r for r in page if should_process_recurring(r)]
+                if not due:
+                    continue
 
-                # Update next due date
-                update_next_due_date(recurring)
+                # Every missed occurrence of every due item, in one batch
+                plans = [plan_recurring(r) for r in due]
+                transactions = [
+                    create_transaction_from_recurring(recurring, occurrence)
+                    for recurring, (occurrences, _, _) in zip(due, plans)
+                    for occurrence in occurrences
+                ]
+                # 25 items per BatchWriteItem
+                with transactions_table.batch_writer() as batch:
+                    for transaction in transactions:
+                        batch.put_item(Item=transaction)
 
-                processed_count += 1
+                # Advance each pointer once, and update rollups, in parallel
+                outcomes = pool.map(update_next_due_date, due, plans)
+                list(pool.map(add_to_daily_totals, group_daily_totals(transactions)))
 
-        # Send summary notification
-        if processed_count > 0:
-            send_telegram_notification(
-                f"🤖 *Recurring Transactions Processed*\n\nProcessed {processed_count} recurring transactions today!"
-            )
+                for recurring, (occurrences, _, _), outcome in zip(
+                    due, plans, outcomes
+                ):
+                    if occurrences:
+                        processed.append((recurring, len(occurrences)))
+                    if outcome == "ended":
+                        ended.append(recurring)
+
+        created_count = sum(count for _, count in processed)
+
+        # Send one digest notification for the whole run
+        if processed or ended:
+            notifier.notify(build_digest(processed, ended))
 
         return {
             "statusCode": 200,
             "body": json.dumps(
                 {
-                    "message": f"Processed {processed_count} recurring transactions",
-                    "processed_count": processed_count,
+                    "message": f"Processed {len(processed)} recurring transactions",
+                    "processed_count": len(processed),
+                    "created_count": created_count,
+                    "ended_count": len(ended),
                 }
             ),
         }
 
     except Exception as e:
         print(f"Error processing recurring transactions: {str(e)}")
-        send_telegram_notification(
-            f"❌ *Error Processing Recurring Transactions*\n\n{str(e)}"
-        )
+        notifier.notify(f"❌ *Error Processing Recurring Transactions*\n\n{str(e)}")
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+    finally:
+        # Lambda freezes the container once we return
+        notifier.flush(timeout=10)
+
+
+def iter_due_recurring_pages(today: str):
+    """Yield pages of active recurring items due on or before today"""
+    for shard in range(DUE_SHARDS):
+        query = {
+            "IndexName": DUE_INDEX,
+            "KeyConditionExpression": "due_shard = :shard AND next_due_day <= :today",
+            "ExpressionAttributeValues": {
+                ":shard": f"active#{shard}",
+                ":today": today,
+            },
+        }
+        while True:
+            response = recurring_table.query(**query)
+            yield response.get("Items", [])
+            if "LastEvaluatedKey" not in response:
+                break
+            query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def backfill_due_index():
+    """
+    One-off: set the DueIndex attributes on items written before the index
+    existed. Invoke the function with {"backfill_due_index": true}.
+    """
+    scan = {
+        "FilterExpression": "is_active = :active AND attribute_not_exists(due_shard)",
+        "ExpressionAttributeValues": {":active": True},
+    }
+    updated = 0
+    while True:
+        response = recurring_table.scan(**scan)
+        for recurring in response.get("Items", []):
+            recurring_table.update_item(
+                Key={
+                    "user_id": recurring["user_id"],
+                    "recurring_id": recurring["recurring_id"],
+                },
+                UpdateExpression="SET due_shard = :shard, next_due_day = :day",
+                ExpressionAttributeValues={
+                    ":shard": due_shard(recurring["recurring_id"]),
+                    ":day": recurring["next_due_date"][:10],
+                },
+            )
+            updated += 1
+        if "LastEvaluatedKey" not in response:
+            return updated
+        scan["ExclusiveStartKey"] = response["LastEvaluatedKey"]
 
 
 def should_process_recurring(recurring):
@@ -69,74 +166,97 @@ def should_process_recurring(recurring):
     return next_due_date.date() <= today
 
 
-def create_transaction_from_recurring(recurring):
-    """Create a new transaction from a recurring transaction"""
+def plan_recurring(recurring):
+    """All occurrences due up to today, plus where the pointer moves next"""
+    next_due = datetime.fromisoformat(recurring["next_due_date"])
+    start = datetime.fromisoformat(
+        recurring.get("start_date") or recurring["next_due_date"]
+    )
+    end_date = recurring.get("end_date")
+    return catch_up(
+        next_due,
+        recurring["frequency"],
+        datetime.utcnow().date(),
+        datetime.fromisoformat(end_date) if end_date else None,
+        anchor_day=start.day,
+    )
+
+
+def create_transaction_from_recurring(recurring, occurrence):
+    """Build the transaction item for one occurrence of a recurring transaction"""
     transaction_id = str(uuid.uuid4())
+    now = datetime.utcnow().isoformat()
 
-    transaction = {
+    return {
         "user_id": recurring["user_id"],
         "transaction_id": transaction_id,
-        "date": datetime.utcnow().isoformat(),
+        "date": occurrence.isoformat(),
         "amount": recurring["amount"],
         "category": recurring["category"],
         "description": recurring["description"],
         "type": recurring["type"],
         "tags": recurring.get("tags", ""),
         "frequency": "One-Off",  # Mark as one-off since it's now a real transaction
-        "created_at": datetime.utcnow().isoformat(),
+        "created_at": now,
+        "updated_at": now,
         "source": "recurring",  # Track that this came from recurring
         "recurring_id": recurring["recurring_id"],
     }
 
-    transactions_table.put_item(Item=transaction)
-
-    # Send Telegram notification
-    emoji = "💰" if recurring["type"] == "income" else "💸"
-    message = f"{emoji} *Recurring Transaction Processed*\n\n"
-    message += f"*{recurring['description']}*\n"
-    message += f"Amount: ${abs(recurring['amount']):.2f}\n"
-    message += f"Category: {recurring['category']}\n"
-    message += f"Frequency: {recurring['frequency']}"
-
-    send_telegram_notification(message)
-    print(f"Created transaction for recurring: {recurring['description']}")
-
-
-def update_next_due_date(recurring):
-    """Update the next due date based on frequency"""
-    current_due = datetime.fromisoformat(recurring["next_due_date"])
-    frequency = recurring["frequency"]
-
-    if frequency == "daily":
-        next_due = current_due + timedelta(days=1)
-    elif frequency == "weekly":
-        next_due = current_due + timedelta(weeks=1)
-    elif frequency == "monthly":
-        # Add one month (approximate)
-        next_due = current_due + timedelta(days=30)
-    elif frequency == "yearly":
-        next_due = current_due + timedelta(days=365)
-    else:
-        next_due = current_due + timedelta(days=30)  # Default to monthly
+
+def group_daily_totals(transactions):
+    """Collapse new transactions into one rollup delta per (user, day, category)"""
+    totals = {}
+    for tx in transactions:
+        key = (tx["user_id"], tx["date"][:10], tx.get("category") or "")
+        amount = Decimal(str(tx["amount"]))
+        bucket = totals.setdefault(key, [Decimal("0"), Decimal("0"), 0])
+        if amount > 0:
+            bucket[0] += amount
+        elif amount < 0:
+            bucket[1] += amount
+        bucket[2] += 1
+    return [(*key, *values) for key, values in totals.items()]
+
+
+def add_to_daily_totals(delta):
+    user_id, day, category, income, expense, count = delta
+    _, daily_totals_table = _thread_tables()
+    daily_totals_table.update_item(
+        Key={"user_id": user_id, "day_category": f"{day}#{category}"},
+        UpdateExpression=(
+            "SET #day = :day, category = :category "
+            "ADD income :income, expense :expense, #count :count"
+        ),
+        ExpressionAttributeNames={"#day": "day", "#count": "count"},
+        ExpressionAttributeValues={
+            ":day": day,
+            ":category": category,
+            ":income": income,
+            ":expense": expense,
+            ":count": count,
+        },
+    )
+
+
+def update_next_due_date(recurring, plan):
+    """Move the next due date past today's occurrences; returns "updated" or "ended" """
+    recurring_table, _ = _thread_tables()
+    _, next_due, active = plan
 
     # Check if we've passed the end date
-    if recurring.get("end_date"):
-        end_date = datetime.fromisoformat(recurring["end_date"])
-        if next_due > end_date:
-            # Deactivate this recurring transaction
-            recurring_table.update_item(
-                Key={
-                    "user_id": recurring["user_id"],
-                    "recurring_id": recurring["recurring_id"],
-                },
-                UpdateExpression="SET is_active = :inactive",
-                ExpressionAttributeValues={":inactive": False},
-            )
-            send_telegram_notification(
-                f"⏹️ *Recurring Transaction Ended*\n\n{recurring['description']} has reached its end date and has been deactivated."
-            )
-            print(f"Deactivated recurring transaction: {recurring['description']}")
-            return
+    if not active:
+        # Deactivate this recurring transaction
+        recurring_table.update_item(
+            Key={
+                "user_id": recurring["user_id"],
+                "recurring_id": recurring["recurring_id"],
+            },
+            UpdateExpression="SET is_active = :inactive REMOVE due_shard",
+            ExpressionAttributeValues={":inactive": False},
+        )
+        print(f"Deactivated recurring transaction: {recurring['description']}")
+        return "ended"
 
     # Update next due date
     recurring_table.update_item(
@@ -144,25 +264,36 @@ def update_next_due_date(recurring):
             "user_id": recurring["user_id"],
             "recurring_id": recurring["recurring_id"],
         },
-        UpdateExpression="SET next_due_date = :next_due",
-        ExpressionAttributeValues={":next_due": next_due.isoformat()},
+        UpdateExpression="SET next_due_date = :next_due, next_due_day = :next_day",
+        ExpressionAttributeValues={
+            ":next_due": next_due.isoformat(),
+            ":next_day": next_due.strftime("%Y-%m-%d"),
+        },
     )
     print(f"Updated next due date for: {recurring['description']}")
+    return "updated"
 
 
-def send_telegram_notification(message: str):
-    """Send notification to Telegram"""
-    bot_token = os.environ.get("TELEGRAM_BOT_TOKEN")
-    chat_id = os.environ.get("TELEGRAM_CHAT_ID")
-
-    if not bot_token or not chat_id:
-        print("Telegram credentials not configured")
-        return
+def build_digest(processed, ended):
+    """One Telegram message summarising the whole run"""
+    message = "🤖 *Recurring Transactions Processed*\n\n"
+    message += f"Processed {len(processed)} recurring transactions today!\n"
 
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    try:
-        requests.post(
-            url, data={"chat_id": chat_id, "text": message, "parse_mode": "Markdown"}
+    for recurring, count in processed[:DIGEST_MAX_LINES]:
+        emoji = "💰" if recurring["type"] == "income" else "💸"
+        times = f" ×{count}" if count > 1 else ""
+        message += (
+            f"\n{emoji} *{recurring['description']}*{times} "
+            f"${abs(recurring['amount']):.2f} ({recurring['category']}, "
+            f"{recurring['frequency']})"
         )
-    except Exception as e:
-        print(f"Failed to send Telegram notification: {e}")
+    if len(processed) > DIGEST_MAX_LINES:
+        message += f"\n…and {len(processed) - DIGEST_MAX_LINES} more"
+
+    if ended:
+        message += "\n\n⏹️ *Recurring Transactions Ended*\n"
+        message += "\n".join(f"{r['description']}" for r in ended[:DIGEST_MAX_LINES])
+        if len(ended) > DIGEST_MAX_LINES:
+            message += f"\n…and {len(ended) - DIGEST_MAX_LINES} more"
+
+    return message
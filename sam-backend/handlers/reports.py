@@ -1,32 +1,48 @@
 import os, json
 import boto3
 from datetime import datetime, timedelta
-import requests
+
+# Shared with the API through SharedModulesLayer
+from notifier import Notifier, telegram_from_env
 
 
 dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(os.environ["TRANSACTIONS_TABLE"])
-TELEGRAM_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
+daily_totals_table = dynamodb.Table(
+    os.environ.get("DAILY_TOTALS_TABLE", "FinanceTracker-DailyTotals")
+)
+DAY_INDEX = os.environ.get("DAILY_TOTALS_DAY_INDEX", "DayIndex")
 SES_FROM = os.environ.get("SES_FROM")
 REPORT_TO = os.environ.get("REPORT_TO")
-
-
-def send_telegram(text):
-    if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
-        url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-        requests.post(url, data={"chat_id": TELEGRAM_CHAT_ID, "text": text})
+notifier = Notifier(telegram_from_env(), coalesce_window=0)
 
 
 def lambda_handler(event, context):
     now = datetime.utcnow()
-    cuttoff = int((now - timedelta(days=7)).timestamp())
-    resp = table.scan()
-    items = [i for i in resp.get("Items", []) if int(i["date_ts"]) >= cuttoff]
-    income = sum(float(i["amount"]) for i in items if float(i["amount"]) > 0)
-    expense = sum(float(i["amount"]) for i in items if float(i["items"]) < 0)
+    # The last 7 calendar days, today included
+    days = [(now - timedelta(days=n)).strftime("%Y-%m-%d") for n in range(6, -1, -1)]
+
+    # One query per day of rollups: the work scales with a week of data,
+    # not with the size of the transactions table
+    income = expense = 0.0
+    for day in days:
+        query = {
+            "IndexName": DAY_INDEX,
+            "KeyConditionExpression": "#day = :day",
+            "ProjectionExpression": "income, expense",
+            "ExpressionAttributeNames": {"#day": "day"},
+            "ExpressionAttributeValues": {":day": day},
+        }
+        while True:
+            resp = daily_totals_table.query(**query)
+            for i in resp.get("Items", []):
+                income += float(i.get("income", 0))
+                expense += float(i.get("expense", 0))
+            if "LastEvaluatedKey" not in resp:
+                break
+            query["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
     text = f"Weekly: inome={income:.2f}, expense={expense:.2f}, net={(income + expense):.2f}"
-    send_telegram(text)
+    notifier.notify(text)
 
     if SES_FROM and REPORT_TO:
         ses = boto3.client("ses")
@@ -38,4 +54,5 @@ def lambda_handler(event, context):
                 "Body": {"Text": {"Data": text}},
             },
         )
+    notifier.flush(timeout=10)
     return {"statusCode": 200, "body": text}
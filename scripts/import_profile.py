@@ -0,0 +1,94 @@
+"""
+Import-time profile of the API as Lambda loads it.
+
+Runs `python -X importtime -c "import app"` from backend/ with the Lambda
+environment set, prints the slowest imports, and exits non-zero if the
+total exceeds the budget or a module that should load lazily shows up.
+
+    python scripts/import_profile.py [--budget-ms 1000] [--top 15] [--local]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+
+# Only needed by the endpoints that use them. csv is not listed because
+# pydantic pulls it in through importlib.metadata.
+LAZY_MODULES = (
+    "classifier",
+    "requests",
+)
+# Local-only; Lambda has no .env file and no bundled frontend
+LAMBDA_SKIPPED_MODULES = (
+    "dotenv",
+    "starlette.staticfiles",
+)
+
+
+def profile(local: bool):
+    env = dict(os.environ)
+    if not local:
+        env.setdefault("AWS_LAMBDA_FUNCTION_NAME", "import-profile")
+        env.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    # "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(cumulative), len(name) - len(name.lstrip())))
+    return modules
+
+
+def eager_imports(modules, local: bool):
+    """The modules that should load lazily but were imported with the app."""
+    names = {name for name, _, _ in modules}
+    lazy_modules = LAZY_MODULES if local else LAZY_MODULES + LAMBDA_SKIPPED_MODULES
+    return [name for name in lazy_modules if name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--local", action="store_true", help="profile the SQLite configuration"
+    )
+    args = parser.parse_args()
+
+    modules = profile(args.local)
+    # Top-level imports are the least indented entries
+    indent = min(depth for _, _, depth in modules)
+    total_ms = sum(us for _, us, depth in modules if depth == indent) / 1000
+
+    print(f"{'cumulative ms':>14}  module")
+    for name, us, depth in sorted(modules, key=lambda m: -m[1])[: args.top]:
+        print(f"{us / 1000:14.1f}  {name}")
+    print(f"\ntotal: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms is over budget")
+    for name in eager_imports(modules, args.local):
+        failures.append(f"{name} is imported at load time")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from backend import db
+
+BASE_SCHEMA = """
+    CREATE TABLE transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT,
+        description TEXT,
+        frequency TEXT DEFAULT 'One-Off',
+        type TEXT,
+        tags TEXT
+    );
+    CREATE TABLE categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        type TEXT,
+        color TEXT,
+        icon TEXT
+    );
+"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "finance.db")
+    conn.executescript(BASE_SCHEMA)
+    yield conn
+    conn.close()
+
+
+def columns(conn):
+    return {row[1] for row in conn.execute("PRAGMA table_info(transactions)")}
+
+
+def test_migrate_to_latest(conn):
+    db.migrate(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(db.MIGRATIONS)
+    assert {"seq", "client_id"} <= columns(conn)
+    # A second run is a no-op
+    db.migrate(conn)
+
+
+def test_failed_migration_rolls_back_its_ddl(conn, monkeypatch):
+    broken = [list(statements) for statements in db.MIGRATIONS]
+    seq_migration = next(
+        i for i, statements in enumerate(broken) if "ADD COLUMN seq" in statements[0]
+    )
+    broken[seq_migration].append("SELECT * FROM no_such_table")
+    monkeypatch.setattr(db, "MIGRATIONS", broken)
+
+    with pytest.raises(sqlite3.OperationalError):
+        db.migrate(conn)
+    # Earlier migrations are kept; the failed one left nothing behind
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == seq_migration
+    assert "seq" not in columns(conn)
+
+    monkeypatch.undo()
+    db.migrate(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(db.MIGRATIONS)
+    assert "seq" in columns(conn)
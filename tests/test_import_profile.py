@@ -0,0 +1,13 @@
+import pytest
+
+from scripts.import_profile import eager_imports, profile
+
+
+def test_local_app_imports_lazy_modules_on_demand():
+    assert eager_imports(profile(local=True), local=True) == []
+
+
+def test_lambda_app_skips_local_only_and_lazy_modules():
+    # The Lambda configuration builds the DynamoDB repository at import time
+    pytest.importorskip("boto3")
+    assert eager_imports(profile(local=False), local=False) == []
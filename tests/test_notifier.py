@@ -0,0 +1,92 @@
+import threading
+import time
+
+from backend.notifier import MAX_MESSAGE_LENGTH, Notifier, digest
+
+
+class FakeTransport:
+    """Records every send; fails the first `failures` attempts."""
+
+    def __init__(self, failures=0, block=None):
+        self.failures = failures
+        self.block = block
+        self.attempts = []
+        self.sent = []
+
+    def send(self, text):
+        self.attempts.append(time.monotonic())
+        if self.block is not None:
+            self.block.wait()
+        if len(self.attempts) <= self.failures:
+            raise RuntimeError("transport down")
+        self.sent.append(text)
+
+
+def test_burst_is_coalesced_into_one_digest():
+    transport = FakeTransport()
+    notifier = Notifier(transport, coalesce_window=0.2)
+    for n in range(3):
+        notifier.notify(f"message {n}")
+
+    assert notifier.flush(timeout=5)
+    assert transport.sent == ["3 notifications\n\nmessage 0\n\nmessage 1\n\nmessage 2"]
+
+
+def test_batches_are_capped_at_max_batch():
+    transport = FakeTransport()
+    notifier = Notifier(transport, coalesce_window=0.2, max_batch=2)
+    for n in range(5):
+        notifier.notify(f"message {n}")
+
+    assert notifier.flush(timeout=5)
+    assert len(transport.sent) == 3
+    assert transport.sent[-1] == "message 4"
+
+
+def test_failed_send_is_retried_with_backoff():
+    transport = FakeTransport(failures=2)
+    notifier = Notifier(transport, coalesce_window=0, retries=3, backoff=0.05)
+    notifier.notify("hello")
+
+    assert notifier.flush(timeout=5)
+    assert transport.sent == ["hello"]
+    first, second, third = transport.attempts
+    assert second - first >= 0.05
+    assert third - second >= 0.1
+
+
+def test_gives_up_after_retries():
+    transport = FakeTransport(failures=10)
+    notifier = Notifier(transport, coalesce_window=0, retries=2, backoff=0.01)
+    notifier.notify("hello")
+
+    assert notifier.flush(timeout=5)
+    assert len(transport.attempts) == 3
+    assert transport.sent == []
+
+
+def test_flush_times_out_while_a_send_is_stuck():
+    release = threading.Event()
+    transport = FakeTransport(block=release)
+    notifier = Notifier(transport, coalesce_window=0)
+    notifier.notify("hello")
+
+    started = time.monotonic()
+    assert not notifier.flush(timeout=0.1)
+    assert time.monotonic() - started < 1
+
+    release.set()
+    assert notifier.flush(timeout=5)
+    assert transport.sent == ["hello"]
+
+
+def test_without_transport_nothing_is_queued():
+    notifier = Notifier(None)
+    notifier.notify("hello")
+    assert notifier.flush(timeout=0)
+
+
+def test_digest_is_truncated_to_the_telegram_limit():
+    text = digest(["x" * MAX_MESSAGE_LENGTH, "y"])
+    assert len(text) == MAX_MESSAGE_LENGTH
+    assert text.endswith("…")
@@ -0,0 +1,73 @@
+import csv
+import io
+
+from backend.statement_parser import (
+    classify_chunks,
+    new_summary,
+    parse_bank_row,
+    parse_plain_row,
+    parse_rows,
+    row_parser,
+)
+
+BANK_HEADER = (
+    "Process Date,Amount,Other Party,Credit Plan Name,Transaction Date,"
+    "Foreign Details,City,Country Code\n"
+)
+
+
+def parse_csv(text):
+    summary = new_summary()
+    reader = csv.DictReader(io.StringIO(text))
+    rows = list(parse_rows(reader, row_parser(reader.fieldnames), summary))
+    return rows, summary
+
+
+def test_bank_rows():
+    rows, summary = parse_csv(
+        BANK_HEADER + "x,-12.50, Countdown ,,03/02/2026,,,\n"
+        "x,100,ACME,,2026-02-04,,,\n"
+    )
+    assert rows == [
+        ("2026-02-03T00:00:00", -12.5, "Countdown"),
+        ("2026-02-04T00:00:00", 100.0, "ACME"),
+    ]
+    assert summary["skipped"] == 0
+
+
+def test_bad_and_short_bank_rows_are_skipped():
+    rows, summary = parse_csv(
+        BANK_HEADER + "x,oops,Countdown,,03/02/2026,,,\n"
+        "x\n"
+        "x,-3,Uber Eats\n"
+        "x,-4,Netflix,,01/02/2026,,,\n"
+    )
+    assert [desc for _, _, desc in rows] == ["Uber Eats", "Netflix"]
+    assert summary["skipped"] == 2
+
+
+def test_plain_rows():
+    rows, summary = parse_csv(
+        "Date,Amount,Description\n2026-01-01,-3,Netflix\n2026-01-02,abc,x\n"
+    )
+    assert rows == [("2026-01-01", -3.0, "Netflix")]
+    assert summary["skipped"] == 1
+
+
+def test_row_parser_detects_bank_exports():
+    assert row_parser(["Amount", "Other Party"]) is parse_bank_row
+    assert row_parser(["date", "amount", "description"]) is parse_plain_row
+    assert row_parser(None) is parse_plain_row
+
+
+def test_classify_chunks_builds_payload_and_summary():
+    summary = new_summary()
+    rows = [("2026-01-01", -3.0, "Netflix")] * 3 + [("2026-01-02", 1200.0, "x")]
+    chunks = list(classify_chunks(rows, summary, 3, user_id="u"))
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    first = chunks[0][0]
+    assert first["user_id"] == "u"
+    assert first["type"] == "expense" and chunks[1][0]["type"] == "income"
+    assert summary["total"] == 4
+    assert summary["auto-classified"] + summary["needs_review"] == 4
+    assert sum(summary["categories"].values()) == 4